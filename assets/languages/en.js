@@ -51,10 +51,12 @@ var lang_en = {
 	'status.listCleared': 'List cleared.',
 	'status.keyDetected': 'Key detected successfully.',
 	'status.keyFailed': 'Key detection failed.',
+	'status.keyInvalid': 'Key check failed on {0} of {1} sampled files. Check the key.',
 	'status.stopping': 'Stopping...',
 	'status.done': 'Done. {0}',
 	'status.noFiles': 'No files selected.',
 	'status.processing_simple': 'Processing {0} ({1})',
+	'status.eta': 'ETA {0}',
 
 	'preview.noPreview': '[No Preview]',
 	'preview.notImage': '[Not an Image]',
@@ -68,6 +70,8 @@ var lang_en = {
 	'col.status': 'Status',
 
 	'status.pending': 'Pending',
+	'status.fileDone': 'Done',
+	'status.fileError': 'Error',
 
 	'ui.appearance': 'Appearance:',
 	'ui.theme.light': 'Light',
@@ -84,15 +88,20 @@ var lang_en = {
 	'ui.openOutput': 'Open Output Folder',
 	'ui.moreFiles': '... and {0} more files',
 	'ui.imagesOnly': '(Images Only)',
+	'ui.jobs': 'Parallel Jobs',
 
 	// === Worker Log Keys ===
 	'mode.decrypt': 'Decryption',
 	'mode.encrypt': 'Encryption',
 	'mode.restore': 'Restore',
+	'mode.rekey': 'Rekey',
+	'mode.export': 'Project Export',
+	'mode.convert': 'MV/MZ Conversion',
 	'log.starting': 'Starting {0} job on {1} files...',
 	'log.cancelled': 'Operation cancelled.',
 	'log.outputDirError': 'Failed to create output dir: {0}',
 	'log.success': 'Success: {0} -> {1}',
 	'log.processError': 'Error processing {0}: {1}',
 	'log.finished': 'Completed. Processed: {0}, Success: {1}. Time: {2}s',
+	'log.skipped': 'Skipped {0} up-to-date files.',
 }
@@ -51,10 +51,12 @@ var lang_zh_hans = {
 	'status.listCleared': '列表已清空。',
 	'status.keyDetected': '密钥检测成功。',
 	'status.keyFailed': '密钥检测失败。',
+	'status.keyInvalid': '密钥校验失败：抽样 {1} 个文件中有 {0} 个不匹配，请检查密钥。',
 	'status.stopping': '正在停止...',
 	'status.done': '完成。{0}',
 	'status.noFiles': '列表为空 (未添加文件)',
 	'status.processing_simple': '正在处理 {0} ({1})',
+	'status.eta': '剩余 {0}',
 
 	'preview.noPreview': '[无预览]',
 	'preview.notImage': '[非图像文件]',
@@ -67,6 +69,8 @@ var lang_zh_hans = {
 	'col.size': '大小',
 	'col.status': '状态',
 	'status.pending': '等待中',
+	'status.fileDone': '完成',
+	'status.fileError': '出错',
 
 	'ui.appearance': '外观模式:',
 	'ui.theme.light': '浅色',
@@ -83,15 +87,20 @@ var lang_zh_hans = {
 	'ui.openOutput': '打开输出文件夹',
 	'ui.moreFiles': '... 还有 {0} 个文件',
 	'ui.imagesOnly': '(仅限图像)',
+	'ui.jobs': '并行任务数',
 
 	// === Worker Log Keys ===
 	'mode.decrypt': '解密',
 	'mode.encrypt': '加密',
 	'mode.restore': '还原',
+	'mode.rekey': '更换密钥',
+	'mode.export': '项目导出',
+	'mode.convert': 'MV/MZ 转换',
 	'log.starting': '开始 {0} 任务，共 {1} 个文件...',
 	'log.cancelled': '操作已取消。',
 	'log.outputDirError': '无法创建输出目录: {0}',
 	'log.success': '成功: {0} -> {1}',
 	'log.processError': '处理 {0} 时出错: {1}',
 	'log.finished': '完成。已处理: {0}, 成功: {1}。耗时: {2}秒',
+	'log.skipped': '已跳过 {0} 个未变化的文件。',
 }
@@ -0,0 +1,260 @@
+"""
+Benchmark runner for throughput regressions.
+
+Generates synthetic MV/MZ games and times the Crypto stream methods, WorkerThread,
+the CLI directory path and KeyFinder.find_key, plus a microbenchmark of the XOR kernel. Results are emitted as JSON
+(files/s, MB/s, peak RSS) so runs can be compared across commits.
+
+Usage (from the repository root):
+    python -m benchmarks.run --out results.json [--scale 0.25] [--only crypto,worker,cli,keyfinder,xor]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Callable, Dict, List
+
+from core.crypto import Crypto, DECRYPT_EXT_MAP
+from core.worker import WorkerThread
+from core.key_finder import KeyFinder
+from core.key_cache import KeyCache
+from core.utils import peak_memory_mb, xor_bytes
+from core import utils
+from benchmarks.synthetic import generate_game, DEFAULT_SPEC, DEFAULT_KEY
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITES = ["crypto", "worker", "cli", "keyfinder", "xor"]
+# Buffer sizes for the XOR microbenchmark: the RPG Maker prefix, a page, a large block
+XOR_SIZES = [16, 4096, 1024 * 1024]
+
+def measure(name: str, files: int, nbytes: int, fn: Callable[[], None], **extra) -> Dict:
+    """Times fn() and returns a result record."""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    record = {
+        "name": name,
+        "files": files,
+        "bytes": nbytes,
+        "seconds": round(seconds, 6),
+        "files_per_s": round(files / seconds, 2) if seconds > 0 else None,
+        "mb_per_s": round(nbytes / (1024 * 1024) / seconds, 2) if seconds > 0 else None,
+        "peak_rss_mb": peak_memory_mb(),
+    }
+    record.update(extra)
+    print(f"{name:<40} {record['files_per_s'] or 0:>12.1f} files/s {record['mb_per_s'] or 0:>10.1f} MB/s", file=sys.stderr)
+    return record
+
+def list_encrypted(game_dir: str, exts=None) -> List[str]:
+    exts = exts or set(DECRYPT_EXT_MAP)
+    paths = []
+    for root, _, files in os.walk(game_dir):
+        for file in files:
+            if os.path.splitext(file)[1].lower() in exts:
+                paths.append(os.path.join(root, file))
+    return paths
+
+def scaled_spec(scale: float) -> Dict:
+    spec = {}
+    for group, params in DEFAULT_SPEC.items():
+        spec[group] = dict(params, count=max(1, int(params["count"] * scale)))
+    return spec
+
+def bench_crypto(game: Dict, work_dir: str) -> List[Dict]:
+    crypto = Crypto(game["key"])
+    paths = list_encrypted(game["game_dir"])
+    images = [p for p in paths if p.endswith((".rpgmvp", ".png_"))]
+    out_path = os.path.join(work_dir, "crypto.out")
+
+    def run(method, inputs):
+        def fn():
+            for path in inputs:
+                with open(path, "rb") as f_in, open(out_path, "wb") as f_out:
+                    method(f_in, f_out)
+        return fn
+
+    total = sum(os.path.getsize(p) for p in paths)
+    image_total = sum(os.path.getsize(p) for p in images)
+    version = game["version"]
+    return [
+        measure(f"crypto.decrypt_stream[{version}]", len(paths), total, run(crypto.decrypt_stream, paths)),
+        measure(f"crypto.encrypt_stream[{version}]", len(paths), total, run(crypto.encrypt_stream, paths)),
+        measure(f"crypto.restore_png_header_stream[{version}]", len(images), image_total,
+                run(crypto.restore_png_header_stream, images)),
+    ]
+
+def bench_worker(game: Dict, work_dir: str, jobs_list: List[int]) -> List[Dict]:
+    results = []
+    paths = list_encrypted(game["game_dir"])
+    total = sum(os.path.getsize(p) for p in paths)
+
+    for jobs in jobs_list:
+        output_dir = os.path.join(work_dir, f"worker_{jobs}")
+        worker = WorkerThread(
+            files=[{'path': p} for p in paths], mode="decrypt", crypto=Crypto(game["key"]),
+            output_dir=output_dir, progress_callback=lambda *args: None,
+            log_callback=lambda m: None, finished_callback=lambda ok, msg: None,
+            jobs=jobs, input_root=game["game_dir"]
+        )
+
+        def fn():
+            worker.start()
+            worker.join()
+
+        results.append(measure(f"worker.decrypt[{game['version']},jobs={jobs}]", len(paths), total, fn, jobs=jobs))
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return results
+
+def bench_cli(game: Dict, work_dir: str, jobs: int) -> List[Dict]:
+    paths = list_encrypted(game["game_dir"])
+    total = sum(os.path.getsize(p) for p in paths)
+    output_dir = os.path.join(work_dir, "cli")
+    cmd = [sys.executable, os.path.join(REPO_ROOT, "main.py"),
+           "-i", game["game_dir"], "-o", output_dir, "-k", game["key"], "--jobs", str(jobs)]
+
+    def fn():
+        # Run in work_dir so latest.log/config.json don't end up in the repository
+        subprocess.run(cmd, cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    record = measure(f"cli.decrypt_dir[{game['version']},jobs={jobs}]", len(paths), total, fn, jobs=jobs)
+    if resource is not None:
+        # Peak RSS of the largest child process so far
+        child_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        record["peak_rss_mb"] = child_peak / (1024 * 1024) if sys.platform == "darwin" else child_peak / 1024
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return [record]
+
+def bench_keyfinder(work_dir: str, version: str, repeat: int) -> List[Dict]:
+    results = []
+    small_spec = {"images": dict(DEFAULT_SPEC["images"], count=200)}
+    cache = KeyCache(os.path.join(work_dir, f"key_cache_{version}.json"))
+    for location in ("system", "js", "image"):
+        root = os.path.join(work_dir, f"keyfinder_{version}_{location}")
+        generate_game(root, version=version, spec=small_spec, key_location=location)
+
+        for use_cache in (False, True):
+            def fn():
+                for _ in range(repeat):
+                    with KeyFinder(root, use_cache=use_cache, cache=cache) as finder:
+                        key = finder.find_key()
+                    if key != DEFAULT_KEY:
+                        raise RuntimeError(f"KeyFinder returned {key!r} for {location}")
+
+            cache_tag = ",cached" if use_cache else ""
+            results.append(measure(f"keyfinder.find_key[{version},{location}{cache_tag}]", repeat, 0, fn,
+                                   repeat=repeat, cached=use_cache))
+    return results
+
+def xor_loop(data: bytes, key: bytes) -> bytes:
+    """The per-byte loop xor_bytes replaced, kept as the baseline."""
+    result = bytearray(len(data))
+    for i in range(len(data)):
+        result[i] = data[i] ^ key[i % len(key)]
+    return bytes(result)
+
+def bench_xor(total_bytes: int = 8 * 1024 * 1024) -> List[Dict]:
+    """Times xor_bytes (with and without NumPy) against the per-byte loop for a few buffer sizes."""
+    results = []
+    key = bytes.fromhex(DEFAULT_KEY)
+    # (name, function, NumPy module to use while timing)
+    variants = [("loop", xor_loop, None), ("int", xor_bytes, None)]
+    if utils.numpy is not None:
+        variants.append(("numpy", xor_bytes, utils.numpy))
+
+    for size in XOR_SIZES:
+        data = os.urandom(size)
+        expected = xor_loop(data, key)
+        for name, fn, numpy_module in variants:
+            # The loop is slow enough that a fraction of the volume is plenty
+            volume = total_bytes // 16 if name == "loop" else total_bytes
+            iterations = max(1, volume // size)
+
+            def run(fn=fn, name=name, numpy_module=numpy_module):
+                saved = utils.numpy
+                utils.numpy = numpy_module
+                try:
+                    for _ in range(iterations):
+                        if fn(data, key) != expected:
+                            raise RuntimeError(f"xor.{name} returned a wrong result for {size} bytes")
+                finally:
+                    utils.numpy = saved
+
+            results.append(measure(f"xor.{name}[{size}B]", iterations, iterations * size, run,
+                                   size=size, iterations=iterations))
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def main():
+    parser = argparse.ArgumentParser(description="RPG Maker Decrypter benchmarks")
+    parser.add_argument('--out', help='Write JSON results to this file (default: stdout)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply the default file counts (default: 1.0)')
+    parser.add_argument('--versions', default="mv,mz", help='Comma-separated game versions (default: mv,mz)')
+    parser.add_argument('--only', default=",".join(SUITES), help=f'Comma-separated suites (default: {",".join(SUITES)})')
+    parser.add_argument('--jobs', default="1,4", help='Comma-separated worker pool sizes (default: 1,4)')
+    parser.add_argument('--repeat', type=int, default=20, help='KeyFinder repetitions (default: 20)')
+    parser.add_argument('--work-dir', help='Directory for generated games (default: a temp dir, removed afterwards)')
+    args = parser.parse_args()
+
+    suites = [s for s in args.only.split(",") if s]
+    jobs_list = [int(j) for j in args.jobs.split(",") if j]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="rpgm_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = []
+    try:
+        if "xor" in suites:
+            results += bench_xor()
+        for version in [v for v in args.versions.split(",") if v]:
+            game = generate_game(os.path.join(work_dir, f"game_{version}"), version=version,
+                                 spec=scaled_spec(args.scale))
+            print(f"Generated {version} game: {game['files']} files, {game['bytes'] / (1024 * 1024):.1f} MB", file=sys.stderr)
+
+            if "crypto" in suites:
+                results += bench_crypto(game, work_dir)
+            if "worker" in suites:
+                results += bench_worker(game, work_dir, jobs_list)
+            if "cli" in suites:
+                results += bench_cli(game, work_dir, max(jobs_list))
+            if "keyfinder" in suites:
+                results += bench_keyfinder(work_dir, version, args.repeat)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
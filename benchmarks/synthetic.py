@@ -0,0 +1,111 @@
+"""
+Synthetic RPG Maker MV/MZ game trees for benchmarking.
+"""
+import os
+import json
+import math
+import random
+from typing import Dict, List
+
+from core.crypto import Crypto, ENCRYPT_EXT_MAP
+
+DEFAULT_KEY = "d41d8cd98f00b204e9800998ecf8427e"
+
+# Plain magic bytes written at the start of each synthetic asset
+PLAIN_HEADERS = {
+    ".png": Crypto.PNG_HEADER,
+    ".ogg": b"OggS" + bytes(12),
+    ".m4a": bytes(4) + b"ftypM4A " + bytes(4),
+}
+
+# Default mix: many small sprites, a few medium sound effects, some large BGM tracks
+DEFAULT_SPEC = {
+    "images": {"count": 2000, "median_kb": 8, "sigma": 1.2, "max_kb": 4096},
+    "audio_ogg": {"count": 60, "median_kb": 300, "sigma": 1.0, "max_kb": 65536},
+    "audio_m4a": {"count": 20, "median_kb": 300, "sigma": 1.0, "max_kb": 65536},
+}
+
+def _sizes(rng: random.Random, count: int, median_kb: float, sigma: float, max_kb: float) -> List[int]:
+    """Log-normal size distribution, clamped to [64 bytes, max_kb]."""
+    sizes = []
+    mu = math.log(median_kb * 1024)
+    for _ in range(count):
+        size = int(rng.lognormvariate(mu, sigma))
+        sizes.append(max(64, min(size, int(max_kb * 1024))))
+    return sizes
+
+def _write_asset(path: str, plain_ext: str, size: int, crypto: Crypto, rng: random.Random):
+    header = PLAIN_HEADERS[plain_ext]
+    body = rng.getrandbits(8 * max(0, size - len(header))).to_bytes(max(0, size - len(header)), "little")
+    with open(path, "wb") as f:
+        f.write(crypto.encrypt(header + body))
+
+def generate_game(root: str, version: str = "mv", key: str = DEFAULT_KEY,
+                  spec: Dict = None, key_location: str = "system", seed: int = 0,
+                  js_filler_kb: int = 512) -> Dict:
+    """
+    Generates a synthetic game below root.
+
+    version: "mv" (assets under www/, .rpgmvp/.rpgmvo/.rpgmvm) or "mz" (.png_/.ogg_/.m4a_).
+    key_location: "system" (System.json), "js" (rpg_core.js/rmmz_core.js) or "image" (no key stored;
+    KeyFinder has to derive it from an image).
+    Returns a summary dict with the game dir, key, file count and total encrypted bytes.
+    """
+    version = version.lower()
+    spec = spec or DEFAULT_SPEC
+    rng = random.Random(seed)
+    crypto = Crypto(key)
+
+    game_dir = os.path.join(root, "www") if version == "mv" else root
+    for sub in ("data", "js/plugins", "img/pictures", "img/characters", "audio/bgm", "audio/se"):
+        os.makedirs(os.path.join(game_dir, sub), exist_ok=True)
+
+    # data/System.json
+    system = {"gameTitle": "Synthetic", "hasEncryptedImages": True, "hasEncryptedAudio": True}
+    if key_location == "system":
+        system["encryptionKey"] = key
+    with open(os.path.join(game_dir, "data", "System.json"), "w", encoding="utf-8") as f:
+        json.dump(system, f)
+
+    # js/ with a core file, main.js and bulky plugins
+    core_name = "rpg_core.js" if version == "mv" else "rmmz_core.js"
+    filler = "// " + "x" * 76 + "\n"
+    filler_block = filler * max(1, js_filler_kb * 1024 // len(filler))
+    with open(os.path.join(game_dir, "js", core_name), "w", encoding="utf-8") as f:
+        f.write(filler_block)
+        if key_location == "js":
+            f.write(f'Decrypter.init = function() {{ this._encryptionKey = "{key}"; }};\n')
+    with open(os.path.join(game_dir, "js", "main.js"), "w", encoding="utf-8") as f:
+        f.write("PluginManager.setup($plugins);\n")
+    for i in range(4):
+        with open(os.path.join(game_dir, "js", "plugins", f"Plugin{i}.js"), "w", encoding="utf-8") as f:
+            f.write(filler_block)
+
+    # Encrypted assets
+    ext_map = ENCRYPT_EXT_MAP[version]
+    groups = [
+        ("images", ".png", ["img/pictures", "img/characters"]),
+        ("audio_ogg", ".ogg", ["audio/bgm", "audio/se"]),
+        ("audio_m4a", ".m4a", ["audio/bgm", "audio/se"]),
+    ]
+    files = 0
+    total_bytes = 0
+    for group, plain_ext, dirs in groups:
+        params = spec.get(group)
+        if not params:
+            continue
+        for i, size in enumerate(_sizes(rng, params["count"], params["median_kb"], params["sigma"], params["max_kb"])):
+            sub = dirs[i % len(dirs)]
+            path = os.path.join(game_dir, sub, f"{group}_{i:06d}{ext_map[plain_ext]}")
+            _write_asset(path, plain_ext, size, crypto, rng)
+            files += 1
+            total_bytes += size + crypto.header_len
+
+    return {
+        "root": root,
+        "game_dir": game_dir,
+        "version": version,
+        "key": key,
+        "files": files,
+        "bytes": total_bytes,
+    }
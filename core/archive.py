@@ -0,0 +1,90 @@
+import os
+import zipfile
+from typing import Dict, Iterator, List, Tuple
+
+def is_archive(path: str) -> bool:
+    """True for zip archives: package.nw, .zip, or an NW.js executable with the game zip appended."""
+    if not os.path.isfile(path):
+        return False
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+class GameArchive:
+    """
+    Read-only view of a packaged game.
+    Members are addressed by virtual paths below the archive path (e.g. Game.exe/www/img/a.rpgmvp),
+    so code written against os.path (relpath, splitext, basename) works unchanged.
+    Members are streamed out of the archive on read; nothing is extracted to disk.
+    """
+    def __init__(self, path: str):
+        self.path = os.path.normpath(path)
+        # zipfile also finds the central directory of a zip appended to an executable
+        self._zip = zipfile.ZipFile(self.path)
+        self._members: Dict[str, zipfile.ZipInfo] = {}
+        # Virtual directory -> (subdirectory names, file names)
+        self._dirs: Dict[str, Tuple[List[str], List[str]]] = {self.path: ([], [])}
+
+        for info in self._zip.infolist():
+            parts = [p for p in info.filename.replace('\\', '/').split('/') if p and p != '.']
+            if not parts or '..' in parts:
+                continue
+            virtual = os.path.join(self.path, *parts)
+            if info.is_dir():
+                self._add_dir(virtual)
+                continue
+            self._members[virtual] = info
+            parent = os.path.dirname(virtual)
+            self._add_dir(parent)
+            self._dirs[parent][1].append(parts[-1])
+
+    def _add_dir(self, virtual: str):
+        if virtual in self._dirs:
+            return
+        parent = os.path.dirname(virtual)
+        self._add_dir(parent)
+        self._dirs[virtual] = ([], [])
+        self._dirs[parent][0].append(os.path.basename(virtual))
+
+    def exists(self, path: str) -> bool:
+        path = os.path.normpath(path)
+        return path in self._members or path in self._dirs
+
+    def isfile(self, path: str) -> bool:
+        return os.path.normpath(path) in self._members
+
+    def getsize(self, path: str) -> int:
+        """Uncompressed size of a member."""
+        return self._info(path).file_size
+
+    def open(self, path: str):
+        """Opens a member for streaming binary reads (safe to call from several threads)."""
+        return self._zip.open(self._info(path))
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk() over the virtual tree (top-down)."""
+        stack = [os.path.normpath(top)]
+        while stack:
+            current = stack.pop()
+            entry = self._dirs.get(current)
+            if entry is None:
+                continue
+            dirs, files = list(entry[0]), list(entry[1])
+            yield current, dirs, files
+            stack.extend(os.path.join(current, d) for d in reversed(dirs))
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _info(self, path: str) -> zipfile.ZipInfo:
+        info = self._members.get(os.path.normpath(path))
+        if info is None:
+            raise FileNotFoundError(f"No such file in archive {self.path}: {path}")
+        return info
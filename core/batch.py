@@ -0,0 +1,136 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from .crypto import Crypto, DECRYPT_EXT_MAP
+from .key_finder import KeyFinder
+from .worker import WorkerThread
+from .config import DEFAULT_JOBS
+
+def is_game_dir(path: str) -> bool:
+    """An MV/MZ game has data/System.json, either directly or under www/."""
+    return (os.path.isfile(os.path.join(path, "data", "System.json"))
+            or os.path.isfile(os.path.join(path, "www", "data", "System.json")))
+
+def find_games(root: str) -> List[str]:
+    """Finds game directories below root (root itself included). Does not descend into a game."""
+    games = []
+    for current, dirs, _ in os.walk(root):
+        if is_game_dir(current):
+            games.append(current)
+            dirs[:] = [] # Don't look for games inside a game
+        else:
+            dirs.sort()
+    return games
+
+def read_game_list(list_file: str) -> List[str]:
+    """Reads one game directory per line; blank lines and lines starting with # are ignored."""
+    games = []
+    with open(list_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                games.append(line)
+    return games
+
+class BatchRunner:
+    """
+    Decrypts many games in one run. Each game gets its own key detection and output subtree,
+    while the file work and key detection scans of all games share one pool of `jobs` threads
+    (the global concurrency limit).
+    """
+    def __init__(self,
+                 games: List[str],
+                 output_root: str,
+                 jobs: int = DEFAULT_JOBS,
+                 log_callback: Callable[[str], None] = logging.info,
+                 use_key_cache: bool = True):
+        self.games = list(dict.fromkeys(games)) # Drop duplicates, keep order
+        self.output_root = output_root
+        self.jobs = max(1, jobs)
+        self.log_callback = log_callback
+        self.use_key_cache = use_key_cache
+        self.results: List[Dict] = []
+        self._workers: List[WorkerThread] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+
+    def run(self) -> List[Dict]:
+        output_names = self._output_names()
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="Batch") as file_pool, \
+                ThreadPoolExecutor(max_workers=min(self.jobs, max(1, len(self.games))), thread_name_prefix="Game") as game_pool:
+            futures = [game_pool.submit(self._run_game, game, output_names[game], file_pool) for game in self.games]
+            self.results = [future.result() for future in futures]
+        return self.results
+
+    def _run_game(self, game_dir: str, output_name: str, file_pool: ThreadPoolExecutor) -> Dict:
+        result = {"game": game_dir, "output": os.path.join(self.output_root, output_name),
+                  "key_source": None, "files": 0, "success": 0, "bytes": 0, "seconds": 0.0, "error": None}
+        start_time = time.time()
+
+        if self._stop_event.is_set():
+            result["error"] = "cancelled"
+            return result
+
+        try:
+            # Detection scans run on the shared file pool too, so the batch never exceeds `jobs` worker threads
+            with KeyFinder(game_dir, use_cache=self.use_key_cache, executor=file_pool) as finder:
+                key = finder.find_key()
+            if not key:
+                result["error"] = "key not found"
+                return result
+            result["key_source"] = finder.key_source
+
+            files = []
+            for root, _, filenames in os.walk(game_dir):
+                for file in filenames:
+                    if os.path.splitext(file)[1].lower() in DECRYPT_EXT_MAP:
+                        files.append({'path': os.path.join(root, file)})
+
+            worker = WorkerThread(
+                files=files, mode="decrypt", crypto=Crypto(key), output_dir=result["output"],
+                progress_callback=lambda *args: None, log_callback=lambda m: None,
+                finished_callback=lambda ok, msg: None, jobs=self.jobs,
+                input_root=game_dir, executor=file_pool
+            )
+            with self._lock:
+                self._workers.append(worker)
+            if self._stop_event.is_set():
+                worker.stop()
+            # Runs synchronously on this game thread; the file work goes to the shared pool
+            worker.run()
+
+            result["files"] = worker.processed_count
+            result["success"] = worker.success_count
+            result["bytes"] = worker.processed_bytes
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            result["seconds"] = time.time() - start_time
+            self.log_callback(f"Finished {game_dir}: {result['success']}/{result['files']} files"
+                              + (f" ({result['error']})" if result["error"] else ""))
+        return result
+
+    def _output_names(self) -> Dict[str, str]:
+        """One output subdirectory per game, named after the game folder (suffixed if names collide)."""
+        names = {}
+        used = set()
+        for game in self.games:
+            base = os.path.basename(os.path.normpath(game)) or "game"
+            name = base
+            counter = 2
+            while name in used:
+                name = f"{base}_{counter}"
+                counter += 1
+            used.add(name)
+            names[game] = name
+        return names
@@ -3,6 +3,7 @@ import os
 import logging
 
 CONFIG_FILE = "config.json"
+DEFAULT_JOBS = 4
 
 DEFAULT_CONFIG = {
     "language": "en",
@@ -15,7 +16,8 @@ DEFAULT_CONFIG = {
         "header_rem": "0000000000",
         "ignore_fake_header": False
     },
-    "last_output_dir": ""
+    "last_output_dir": "",
+    "jobs": DEFAULT_JOBS
 }
 
 class Config:
@@ -91,6 +93,14 @@ class Config:
     def expert_settings(self, value):
         self.data["expert_settings"] = value
 
+    @property
+    def jobs(self):
+        return self.data.get("jobs", DEFAULT_JOBS)
+
+    @jobs.setter
+    def jobs(self, value):
+        self.data["jobs"] = value
+
 # Global instance
 _config_instance = Config()
 
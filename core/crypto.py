@@ -1,7 +1,26 @@
 import os
+import sys
+import stat
 import binascii
 from typing import Optional, List
 from core.language import get_text
+from core.utils import xor_bytes
+from core.decrypted_file import DecryptedFile
+
+# Extension mapping (encrypted -> plain)
+DECRYPT_EXT_MAP = {
+    ".rpgmvp": ".png",
+    ".rpgmvm": ".m4a",
+    ".rpgmvo": ".ogg",
+    ".png_": ".png",
+    ".m4a_": ".m4a",
+    ".ogg_": ".ogg",
+}
+# Extension mapping (plain -> encrypted), per target version
+ENCRYPT_EXT_MAP = {
+    "mv": {".png": ".rpgmvp", ".m4a": ".rpgmvm", ".ogg": ".rpgmvo"},
+    "mz": {".png": ".png_", ".m4a": ".m4a_", ".ogg": ".ogg_"},
+}
 
 class Crypto:
     DEFAULT_HEADER_LEN = 16
@@ -10,6 +29,12 @@ class Crypto:
     DEFAULT_REMAIN = "0000000000"
     # Standard PNG Header: 89 50 4E 47 0D 0A 1A 0A 00 00 00 0D 49 48 44 52
     PNG_HEADER = bytes.fromhex("89504E470D0A1A0A0000000D49484452")
+    # Known magic bytes of decrypted files, by plain extension: (offset, magic)
+    MAGIC_BYTES = {
+        ".png": (0, PNG_HEADER),  # PNG signature + IHDR chunk
+        ".ogg": (0, b"OggS"),
+        ".m4a": (4, b"ftyp"),
+    }
 
     def __init__(self, key: str = None):
         self.key_hex = key
@@ -68,16 +93,10 @@ class Crypto:
         if len(content) < xor_len:
             xor_len = len(content)
 
-        decrypted_prefix = bytearray(xor_len)
-        for i in range(xor_len):
-            # XOR with key bytes. Key should be at least xor_len long (16 bytes).
-            # If key is shorter, we cycle? The JS code assumes key length covers it.
-            # "outputKey += Decrypter._encryptionKey[i];" implies key is array of strings.
-            # We'll assume safe key length or cycle.
-            k = self.key_bytes[i % len(self.key_bytes)]
-            decrypted_prefix[i] = content[i] ^ k
+        # The JS code assumes the key covers the prefix; a shorter key is cycled.
+        decrypted_prefix = xor_bytes(content[:xor_len], self.key_bytes)
 
-        return bytes(decrypted_prefix) + content[xor_len:]
+        return decrypted_prefix + content[xor_len:]
 
     def encrypt(self, data: bytes) -> bytes:
         """
@@ -95,15 +114,52 @@ class Crypto:
         if len(data) < xor_len:
             xor_len = len(data)
 
-        encrypted_prefix = bytearray(xor_len)
-        for i in range(xor_len):
-             k = self.key_bytes[i % len(self.key_bytes)]
-             encrypted_prefix[i] = data[i] ^ k
+        encrypted_prefix = xor_bytes(data[:xor_len], self.key_bytes)
         
         fake_header = self._build_fake_header()
         
         return fake_header + encrypted_prefix + data[xor_len:]
 
+    def rekey(self, data: bytes, new_key: str) -> bytes:
+        """
+        Re-encrypts data with a different key without touching the body.
+        Only the encrypted prefix (directly after the fake header) changes.
+        """
+        if not data:
+            raise ValueError(get_text("exception.emptyFile"))
+
+        if not self.ignore_fake_header:
+            if not self.verify_fake_header(data):
+                raise ValueError(get_text("exception.invalidFakeHeader.1"))
+
+        encrypted_prefix = data[self.header_len:self.header_len * 2]
+        return data[:self.header_len] + self._rekey_prefix(encrypted_prefix, new_key) + data[self.header_len * 2:]
+
+    def _rekey_prefix(self, encrypted_prefix: bytes, new_key: str) -> bytes:
+        """XORs the prefix with the current key (decrypt), then with new_key (encrypt)."""
+        new_key_bytes = binascii.unhexlify(new_key) if new_key else None
+        if not self.key_bytes or not new_key_bytes:
+            raise ValueError(get_text("error.enDecrypt.noCode"))
+
+        return xor_bytes(xor_bytes(encrypted_prefix, self.key_bytes), new_key_bytes)
+
+    def check_sample(self, data: bytes, plain_ext: str) -> Optional[bool]:
+        """
+        Decrypts the start of an encrypted file (fake header + encrypted prefix is enough)
+        and checks it against the known magic bytes of the plain file type.
+        Returns None if there are no known magic bytes for plain_ext.
+        """
+        magic = self.MAGIC_BYTES.get(plain_ext.lower())
+        if magic is None:
+            return None
+        offset, expected = magic
+
+        try:
+            plain = self.decrypt(data[:self.header_len * 2])
+        except ValueError:
+            return False
+        return plain[offset:offset + len(expected)] == expected
+
     def restore_png_header(self, data: bytes) -> bytes:
         """
         Restores a PNG file by discarding the fake header AND the encrypted header,
@@ -126,6 +182,17 @@ class Crypto:
         
         return self.PNG_HEADER + rest_of_file
 
+    def open_decrypted(self, source, use_mmap: bool = False) -> DecryptedFile:
+        """
+        Opens an encrypted file (path or binary file object) as a read-only, seekable plaintext file.
+        Nothing is decrypted up front except the prefix; see DecryptedFile.
+        """
+        return DecryptedFile(source, self, use_mmap=use_mmap)
+
+    def open_restored(self, source, use_mmap: bool = False) -> DecryptedFile:
+        """Like open_decrypted, but with the 'Restore Images' view (standard PNG header, no key needed)."""
+        return DecryptedFile(source, self, restore=True, use_mmap=use_mmap)
+
     def decrypt_stream(self, input_stream, output_stream, chunk_size=65536):
         """
         Stream version of decrypt.
@@ -157,20 +224,12 @@ class Crypto:
         # xor_len = self.header_len if len(content) >= self.header_len else len(content)
         # Here we read exactly header_len or less if EOF.
         
-        xor_len = len(encrypted_prefix)
-        decrypted_prefix = bytearray(xor_len)
-        for i in range(xor_len):
-            k = self.key_bytes[i % len(self.key_bytes)]
-            decrypted_prefix[i] = encrypted_prefix[i] ^ k
+        decrypted_prefix = xor_bytes(encrypted_prefix, self.key_bytes)
             
         output_stream.write(decrypted_prefix)
         
         # 4. Stream the rest
-        while True:
-            chunk = input_stream.read(chunk_size)
-            if not chunk:
-                break
-            output_stream.write(chunk)
+        self._copy_tail(input_stream, output_stream, chunk_size)
 
     def encrypt_stream(self, input_stream, output_stream, chunk_size=65536):
         """
@@ -187,20 +246,34 @@ class Crypto:
         prefix_data = input_stream.read(self.header_len)
         
         # 3. XOR prefix
-        xor_len = len(prefix_data)
-        encrypted_prefix = bytearray(xor_len)
-        for i in range(xor_len):
-             k = self.key_bytes[i % len(self.key_bytes)]
-             encrypted_prefix[i] = prefix_data[i] ^ k
+        encrypted_prefix = xor_bytes(prefix_data, self.key_bytes)
         
         output_stream.write(encrypted_prefix)
         
         # 4. Stream the rest
-        while True:
-            chunk = input_stream.read(chunk_size)
-            if not chunk:
-                break
-            output_stream.write(chunk)
+        self._copy_tail(input_stream, output_stream, chunk_size)
+
+    def rekey_stream(self, stream, new_key: str):
+        """
+        In-place version of rekey. The stream must be opened read/write ('r+b').
+        Only the encrypted prefix is rewritten; the rest of the file is left alone.
+        """
+        stream.seek(0)
+        fake_header = stream.read(self.header_len)
+        if len(fake_header) < self.header_len:
+            raise ValueError(get_text("exception.fileTooShort"))
+
+        if not self.ignore_fake_header:
+            if fake_header != self._build_fake_header():
+                raise ValueError(get_text("exception.invalidFakeHeader.1"))
+
+        encrypted_prefix = stream.read(self.header_len)
+        if len(encrypted_prefix) == 0:
+            return # Nothing encrypted after the header
+
+        rekeyed_prefix = self._rekey_prefix(encrypted_prefix, new_key)
+        stream.seek(self.header_len)
+        stream.write(rekeyed_prefix)
 
     def restore_png_header_stream(self, input_stream, output_stream, chunk_size=65536):
         """
@@ -223,9 +296,73 @@ class Crypto:
         output_stream.write(self.PNG_HEADER)
         
         # 3. Stream the rest
-        while True:
-            chunk = input_stream.read(chunk_size)
-            if not chunk:
-                break
-            output_stream.write(chunk)
+        self._copy_tail(input_stream, output_stream, chunk_size)
+
+    def _copy_tail(self, input_stream, output_stream, chunk_size=65536):
+        """
+        Copies everything from the current input position to the output.
+        On Linux, real files are copied kernel-side (copy_file_range / sendfile)
+        so the untouched body never passes through Python.
+        Falls back to a chunked read/write loop when that isn't possible.
+        """
+        if not self._copy_tail_kernel(input_stream, output_stream):
+            while True:
+                chunk = input_stream.read(chunk_size)
+                if not chunk:
+                    break
+                output_stream.write(chunk)
+
+    @staticmethod
+    def _copy_tail_kernel(input_stream, output_stream) -> bool:
+        """Returns True if the tail was copied kernel-side, False if the caller should fall back."""
+        if not sys.platform.startswith("linux"):
+            return False
+
+        try:
+            in_fd = input_stream.fileno()
+            out_fd = output_stream.fileno()
+            in_pos = input_stream.tell()
+            in_stat = os.fstat(in_fd)
+            out_stat = os.fstat(out_fd)
+        except (AttributeError, OSError, ValueError):
+            # Not backed by a real file (BytesIO, zip member, ...)
+            return False
+        # Pipes and devices report no usable size; only regular files can be trusted
+        if not (stat.S_ISREG(in_stat.st_mode) and stat.S_ISREG(out_stat.st_mode)):
+            return False
+        remaining = in_stat.st_size - in_pos
+
+        if remaining <= 0:
+            # Nothing left, or a /proc-style file that reports a size of 0: let the chunk loop find out
+            return False
+
+        # Push our buffered header bytes to the fd before the kernel writes after them
+        output_stream.flush()
+        out_pos = output_stream.tell()
+
+        copied = 0
+        try:
+            if hasattr(os, "copy_file_range"):
+                while copied < remaining:
+                    n = os.copy_file_range(in_fd, out_fd, remaining - copied,
+                                           in_pos + copied, out_pos + copied)
+                    if n == 0:
+                        break
+                    copied += n
+            else:
+                # sendfile writes at the output fd's current offset
+                os.lseek(out_fd, out_pos, os.SEEK_SET)
+                while copied < remaining:
+                    n = os.sendfile(out_fd, in_fd, in_pos + copied, remaining - copied)
+                    if n == 0:
+                        break
+                    copied += n
+        except OSError:
+            # Unsupported by this filesystem/kernel (EXDEV, EINVAL, ENOSYS, ...).
+            # The chunk loop picks up from whatever was already copied.
+            pass
 
+        # Keep the Python-level stream positions in sync with what was copied
+        input_stream.seek(in_pos + copied)
+        output_stream.seek(out_pos + copied)
+        return copied >= remaining
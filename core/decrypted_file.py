@@ -0,0 +1,116 @@
+import io
+import os
+import mmap
+from typing import BinaryIO, Union
+
+class DecryptedFile(io.RawIOBase):
+    """
+    Read-only, seekable plaintext view of an encrypted file.
+    Only the decrypted prefix (header_len bytes) is held in memory; it is overlaid on the
+    original file and every other byte is read straight from it (or from an mmap of it),
+    so any offset can be read with O(1) extra memory and no temp file.
+
+    restore=True gives the 'Restore Images' view instead: a standard PNG header followed by
+    the file body, which needs no key.
+    Prefer Crypto.open_decrypted / Crypto.open_restored over constructing this directly.
+    """
+    def __init__(self, source: Union[str, BinaryIO], crypto, restore: bool = False, use_mmap: bool = False):
+        super().__init__()
+        self._map = None
+        self._pos = 0
+        # A path is opened (and closed) here; a file object is used as-is and left open
+        self._owns_file = isinstance(source, (str, bytes, os.PathLike))
+        self._file = None
+        self._file = open(source, "rb") if self._owns_file else source
+
+        try:
+            header_len = crypto.header_len
+            file_size = self._file_size()
+            self._file.seek(0)
+            if restore:
+                if file_size < header_len * 2:
+                    raise ValueError("File too short")
+                self._prefix = crypto.PNG_HEADER
+                self._body_offset = header_len * 2
+            else:
+                # Verifies the fake header and decrypts the prefix
+                self._prefix = crypto.decrypt(self._file.read(header_len * 2))
+                self._body_offset = header_len + len(self._prefix)
+            self._size = len(self._prefix) + max(0, file_size - self._body_offset)
+
+            if use_mmap and file_size > 0:
+                try:
+                    self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                except (AttributeError, OSError, ValueError):
+                    self._map = None # Not a real file; plain reads work just as well
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def size(self) -> int:
+        """Size of the plaintext."""
+        return self._size
+
+    def _file_size(self) -> int:
+        try:
+            return os.fstat(self._file.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            return self._file.seek(0, os.SEEK_END)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        wanted = min(len(view), self._size - self._pos)
+        if wanted <= 0:
+            return 0
+
+        done = 0
+        prefix_len = len(self._prefix)
+        if self._pos < prefix_len:
+            done = min(wanted, prefix_len - self._pos)
+            view[:done] = self._prefix[self._pos:self._pos + done]
+
+        if done < wanted:
+            offset = self._body_offset + self._pos + done - prefix_len
+            if self._map is not None:
+                view[done:wanted] = self._map[offset:offset + wanted - done]
+                done = wanted
+            else:
+                self._file.seek(offset)
+                done += self._file.readinto(view[done:wanted]) or 0
+
+        self._pos += done
+        return done
+
+    def close(self):
+        if self.closed:
+            return
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._owns_file and self._file is not None:
+            self._file.close()
+        super().close()
@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict
+
+class Journal:
+    """
+    Append-only record of completed files, so an interrupted job can be resumed.
+    The first line holds the settings fingerprint (see Manifest.settings_fingerprint), every
+    following line one finished file: its path relative to the input root, the source size
+    and the output size. Lines are flushed as they are written and fsynced at most once per
+    SYNC_INTERVAL, so a crash loses at most the last moment of work; a torn last line is ignored.
+    """
+    DEFAULT_NAME = ".rpgm_journal.jsonl"
+    SYNC_INTERVAL = 1.0
+
+    def __init__(self, path: str, fingerprint: str, resume: bool = False):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._last_sync = 0.0
+        self.logger = logging.getLogger("Journal")
+
+        if resume:
+            self.load()
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        if self.entries:
+            torn = self._ends_torn()
+            self._file = open(path, "a", encoding="utf-8")
+            if torn:
+                # Finish the torn line so it can't swallow the next record
+                self._file.write("\n")
+        else:
+            # Fresh journal: a new run starts over
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"fingerprint": fingerprint})
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        entries = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from the crash
+                    continue
+                if number == 0:
+                    if record.get("fingerprint") != self.fingerprint:
+                        self.logger.info("Journal was written with different settings, starting over.")
+                        return
+                    continue
+                entries[record["path"]] = record
+        self.entries = entries
+
+    def _ends_torn(self) -> bool:
+        with open(self.path, "rb") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def __contains__(self, rel_path: str) -> bool:
+        return self._key(rel_path) in self.entries
+
+    def is_done(self, rel_path: str, source_size: int, output_path: str) -> bool:
+        """True if rel_path was completed with the same source size and its output is still intact."""
+        entry = self.entries.get(self._key(rel_path))
+        if not entry or entry["size"] != source_size:
+            return False
+        try:
+            return os.path.getsize(output_path) == entry["output_size"]
+        except OSError:
+            return False
+
+    def record(self, rel_path: str, source_size: int, output_path: str):
+        """Appends a completed file. Thread-safe."""
+        self._write({"path": self._key(rel_path), "size": source_size, "output_size": os.path.getsize(output_path)})
+
+    def _write(self, record: Dict):
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            now = time.monotonic()
+            if now - self._last_sync >= self.SYNC_INTERVAL:
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def discard(self):
+        """Closes and deletes the journal, once the job it tracks has completed."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _key(rel_path: str) -> str:
+        return rel_path.replace(os.sep, "/")
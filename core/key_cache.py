@@ -0,0 +1,102 @@
+import os
+import json
+import logging
+import threading
+from typing import Dict, Optional
+
+KEY_CACHE_FILE = "key_cache.json"
+
+# Files whose size/mtime identify a game build (missing files are part of the fingerprint too)
+FINGERPRINT_FILES = [
+    os.path.join("data", "System.json"),
+    os.path.join("js", "rpg_core.js"),
+    os.path.join("js", "rmmz_core.js"),
+    os.path.join("js", "main.js"),
+]
+
+class KeyCache:
+    """
+    On-disk cache of detected keys, keyed by game directory.
+    Each entry carries a cheap fingerprint (size + mtime of System.json and the core JS files),
+    so an entry is ignored as soon as one of those files changes.
+    """
+    def __init__(self, path: str = KEY_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    @staticmethod
+    def fingerprint(game_dir: str) -> str:
+        if os.path.isfile(game_dir):
+            # Packaged game (package.nw / zip): the archive itself identifies the build
+            st = os.stat(game_dir)
+            return f"archive:{st.st_size}:{st.st_mtime_ns}"
+
+        parts = []
+        for base in (game_dir, os.path.join(game_dir, "www")):
+            for rel in FINGERPRINT_FILES:
+                try:
+                    st = os.stat(os.path.join(base, rel))
+                    parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+                except OSError:
+                    parts.append("-")
+        return "|".join(parts)
+
+    def get(self, game_dir: str) -> Optional[Dict]:
+        """Returns {'key': ..., 'source': ..., ['confidence': ...]} if a still-valid entry exists."""
+        with self._lock:
+            entry = self.data.get(self._key(game_dir))
+        if entry and entry.get("fingerprint") == self.fingerprint(game_dir):
+            return entry
+        return None
+
+    def put(self, game_dir: str, key: str, source: str, confidence: Optional[float] = None):
+        entry = {"fingerprint": self.fingerprint(game_dir), "key": key, "source": source}
+        if confidence is not None:
+            entry["confidence"] = confidence
+        with self._lock:
+            self.data[self._key(game_dir)] = entry
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self.data = {}
+            if os.path.exists(self.path):
+                try:
+                    os.remove(self.path)
+                except OSError as e:
+                    logging.error(f"Failed to clear key cache: {e}")
+
+    @staticmethod
+    def _key(game_dir: str) -> str:
+        return os.path.abspath(game_dir)
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Failed to load key cache: {e}")
+            return {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Failed to save key cache: {e}")
+
+# Global instance (created on first use)
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+def get_key_cache() -> KeyCache:
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = KeyCache()
+    return _cache_instance
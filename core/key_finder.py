@@ -1,8 +1,13 @@
 import os
 import re
 import json
+import mmap
 import binascii
-from typing import Optional
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from collections import Counter
+from typing import Optional, List, Dict
 import logging
 
 try:
@@ -10,44 +15,164 @@ try:
 except ImportError:
     lzstring = None
 
-from .crypto import Crypto
+from .crypto import Crypto, DECRYPT_EXT_MAP
+from .validator import KeyValidator, DEFAULT_SAMPLES
+from .utils import xor_bytes
+from .archive import GameArchive, is_archive
+from .key_cache import KeyCache, get_key_cache
+
+# JS key scan: core files are checked first
+JS_PRIORITY = ["rpg_core.js", "rmmz_core.js", "main.js"]
+JS_KEY_ANCHOR = b"_encryptionKey"
+JS_KEY_PATTERN = re.compile(rb'this\._encryptionKey\s*=\s*["\']([0-9a-fA-F]+)["\']')
+JS_KEY_WINDOW = 256 # Bytes after the anchor handed to the regex
+JS_SCAN_WORKERS = 4
+
+# Image key derivation: number of images that vote on the key
+IMAGE_SAMPLES = 16
+IMAGE_SCAN_WORKERS = 4
 
 class KeyFinder:
-    def __init__(self, game_dir: str):
-        self.game_dir = game_dir
+    def __init__(self, game_dir: str, use_cache: bool = True, cache: Optional[KeyCache] = None,
+                 executor: Optional[Executor] = None):
+        # game_dir may also be a packaged game (package.nw / zip / exe with an appended zip);
+        # its files are then read straight from the archive
+        self.archive = GameArchive(game_dir) if is_archive(game_dir) else None
+        self.game_dir = self.archive.path if self.archive else game_dir
+        # Look up / store detected keys in the on-disk key cache (the global one unless given)
+        self.use_cache = use_cache
+        self.cache = cache
+        # Where the last find_key() result came from: "system.json", "js", "image" or None
+        self.key_source = None
+        self.from_cache = False
+        # Share of sampled images that agreed on an image-derived key (None for other sources)
+        self.key_confidence = None
+        # Shared executor for the JS and image scans (e.g. the batch file pool, so detection stays
+        # within its thread limit). If None, a small pool is created per scan.
+        self.executor = executor
         self.logger = logging.getLogger("KeyFinder")
 
+    def close(self):
+        """Closes the packaged game, if game_dir was one."""
+        if self.archive:
+            self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def find_key(self) -> Optional[str]:
-        """Attempts to find the key using all available methods."""
-        # 1. System.json
-        key = self.find_key_in_system_json()
-        if key:
-            return key
+        """
+        Attempts to find the key using all available methods.
+        Each candidate is checked against a few encrypted files of the game;
+        a candidate that fails the check is skipped in favour of the next method.
+        Validated keys are cached per game until System.json or the core JS files change.
+        """
+        self.from_cache = False
+        self.key_confidence = None
+        if self.use_cache:
+            cached = (self.cache or get_key_cache()).get(self.game_dir)
+            if cached:
+                self.key_source = cached["source"]
+                self.key_confidence = cached.get("confidence")
+                self.from_cache = True
+                return cached["key"]
 
-        # 2. Code Scan
-        key = self.scan_js_files()
-        if key:
+        methods = [
+            ("system.json", self.find_key_in_system_json), # 1. System.json
+            ("js", self.scan_js_files),                    # 2. Code Scan
+            ("image", self.derive_key_from_images),        # 3. Image Analysis (Last resort, requires an encrypted image)
+        ]
+
+        self.key_source = None
+        rejected = None
+        for source, method in methods:
+            self.key_confidence = None
+            key = method()
+            if not key:
+                continue
+            if self.validate_key(key) is False:
+                self.logger.warning(f"Key from {source} failed sample validation, trying next method.")
+                if not rejected:
+                    rejected = (source, key, self.key_confidence)
+                continue
+            self.key_source = source
+            if self.use_cache:
+                (self.cache or get_key_cache()).put(self.game_dir, key, source, self.key_confidence)
             return key
-            
-        # 3. Image Analysis (Last resort, requires an encrypted image)
-        key = self.derive_key_from_images()
-        if key:
+
+        if rejected:
+            self.logger.warning("No key passed sample validation, returning the first candidate.")
+            self.key_source, key, self.key_confidence = rejected
             return key
-            
         return None
 
+    def validate_key(self, key: str, samples_per_type: int = DEFAULT_SAMPLES) -> Optional[bool]:
+        """
+        Checks a key against a few encrypted files of the game.
+        Returns None if the game has no encrypted files to check against.
+        """
+        samples = self._collect_encrypted_files(limit_per_type=samples_per_type * 8)
+        if not samples:
+            return None
+
+        try:
+            validator = KeyValidator(Crypto(key), samples_per_type, opener=self._open)
+        except (ValueError, TypeError) as e:
+            self.logger.warning(f"Invalid key {key}: {e}")
+            return False
+
+        result = validator.validate(samples)
+        if result["checked"] == 0:
+            return None
+        return KeyValidator.is_valid(result)
+
+    def _collect_encrypted_files(self, limit_per_type: int) -> List[str]:
+        """Collects up to limit_per_type encrypted files per extension from img/ and audio/."""
+        found: Dict[str, List[str]] = {}
+        for name in ("img", "audio"):
+            base = os.path.join(self.game_dir, name)
+            if not self._exists(base):
+                base = os.path.join(self.game_dir, "www", name)
+            if not self._exists(base):
+                continue
+
+            for root, _, files in self._walk(base):
+                for file in files:
+                    ext = os.path.splitext(file)[1].lower()
+                    if ext in DECRYPT_EXT_MAP:
+                        bucket = found.setdefault(ext, [])
+                        if len(bucket) < limit_per_type:
+                            bucket.append(os.path.join(root, file))
+
+        return [path for bucket in found.values() for path in bucket]
+
+    # --- File access (game directory or archive) ---
+
+    def _exists(self, path: str) -> bool:
+        return self.archive.exists(path) if self.archive else os.path.exists(path)
+
+    def _walk(self, top: str):
+        return self.archive.walk(top) if self.archive else os.walk(top)
+
+    def _open(self, path: str):
+        """Opens a game file for binary reads."""
+        return self.archive.open(path) if self.archive else open(path, 'rb')
+
     def find_key_in_system_json(self) -> Optional[str]:
         system_json_path = os.path.join(self.game_dir, "data", "System.json")
-        if not os.path.exists(system_json_path):
+        if not self._exists(system_json_path):
             # Try www/data/System.json (deployed web version)
             system_json_path = os.path.join(self.game_dir, "www", "data", "System.json")
         
-        if not os.path.exists(system_json_path):
+        if not self._exists(system_json_path):
             return None
 
         try:
-            with open(system_json_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with self._open(system_json_path) as f:
+                content = f.read().decode('utf-8')
             
             # Try direct JSON parse
             try:
@@ -70,85 +195,156 @@ class KeyFinder:
         return None
 
     def scan_js_files(self) -> Optional[str]:
-        """Scans js files for the encryption key assignment."""
+        """
+        Scans js files for the encryption key assignment.
+        Files are memory-mapped and searched for the literal anchor before the regex runs;
+        several files are scanned concurrently, core files first, and the first hit cancels the rest.
+        """
         js_dir = os.path.join(self.game_dir, "js")
-        if not os.path.exists(js_dir):
+        if not self._exists(js_dir):
              js_dir = os.path.join(self.game_dir, "www", "js")
         
-        if not os.path.exists(js_dir):
+        if not self._exists(js_dir):
             return None
 
         js_files = []
-        for root, _, files in os.walk(js_dir):
+        for root, _, files in self._walk(js_dir):
             for file in files:
                 if file.endswith(".js"):
                     js_files.append(os.path.join(root, file))
-        
-        # Prioritize rpg_core.js
-        js_files.sort(key=lambda x: 0 if "rpg_core.js" in os.path.basename(x) else 1)
-        
-        pattern = re.compile(r'this\._encryptionKey\s*=\s*["\']([0-9a-fA-F]+)["\']')
-        
-        for full_path in js_files:
-            try:
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    match = pattern.search(content)
-                    if match:
-                        return match.group(1)
-            except Exception as e:
-                self.logger.error(f"Error scanning {full_path}: {e}")
 
+        if not js_files:
+            return None
+
+        # Prioritize core files (rpg_core.js, rmmz_core.js, main.js), then the rest
+        js_files.sort(key=self._js_priority)
+
+        found = threading.Event()
+        key = None
+        with self._scan_pool(min(JS_SCAN_WORKERS, len(js_files)), "JsScan") as pool:
+            futures = [pool.submit(self._scan_js_file, path, found) for path in js_files]
+            for future in as_completed(futures):
+                key = future.result()
+                if key:
+                    found.set()
+                    for other in futures:
+                        other.cancel()
+                    break
+
+        return key
+
+    def _scan_pool(self, max_workers: int, name: str):
+        """The shared executor (left running), or a new pool that is shut down after the scan."""
+        if self.executor:
+            return nullcontext(self.executor)
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    @staticmethod
+    def _js_priority(path: str):
+        name = os.path.basename(path)
+        rank = JS_PRIORITY.index(name) if name in JS_PRIORITY else len(JS_PRIORITY)
+        return rank, path
+
+    def _scan_js_file(self, path: str, found: threading.Event) -> Optional[str]:
+        """Searches one file for the key assignment. Returns None early once another file had a hit."""
+        if found.is_set():
+            return None
+
+        try:
+            if self.archive:
+                # Archive members can't be mapped; they are streamed out of the archive instead
+                with self.archive.open(path) as f:
+                    return self._search_key(f.read(), found)
+
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                        return self._search_key(content, found)
+                except (OSError, ValueError):
+                    # Not mappable (special file, ...): read it instead
+                    return self._search_key(f.read(), found)
+        except Exception as e:
+            self.logger.error(f"Error scanning {path}: {e}")
+        return None
+
+    @staticmethod
+    def _search_key(content, found: threading.Event) -> Optional[str]:
+        """Finds the cheap literal anchor first and only runs the regex on a small window around it."""
+        pos = content.find(JS_KEY_ANCHOR)
+        while pos != -1:
+            if found.is_set():
+                return None
+            window = content[max(0, pos - 5):pos + JS_KEY_WINDOW] # 5 = len(b"this.")
+            match = JS_KEY_PATTERN.match(window)
+            if match:
+                return match.group(1).decode('ascii')
+            pos = content.find(JS_KEY_ANCHOR, pos + 1)
         return None
 
     def derive_key_from_images(self) -> Optional[str]:
         """
-        Derives key by comparing encrypted image header with standard PNG header.
+        Derives key by comparing encrypted image headers with the standard PNG header.
         Key = EncryptedBytes ^ PNGHeaderBytes
+        A bounded, evenly spread sample of images is read (32 bytes each) and the most common
+        candidate wins; key_confidence is set to the share of readable samples that agree.
         """
         img_dir = os.path.join(self.game_dir, "img")
-        if not os.path.exists(img_dir):
+        if not self._exists(img_dir):
             img_dir = os.path.join(self.game_dir, "www", "img")
             
-        if not os.path.exists(img_dir):
+        if not self._exists(img_dir):
             return None
 
-        # Find a .rpgmvp or .png_ file
+        # Collect .rpgmvp / .png_ files
         target_exts = {'.rpgmvp', '.png_'}
-        sample_file = None
-        
-        for root, _, files in os.walk(img_dir):
+        image_files = []
+        for root, _, files in self._walk(img_dir):
             for file in files:
                 _, ext = os.path.splitext(file)
                 if ext.lower() in target_exts:
-                    sample_file = os.path.join(root, file)
-                    break
-            if sample_file:
-                break
-        
-        if not sample_file:
+                    image_files.append(os.path.join(root, file))
+
+        if not image_files:
             return None
 
+        image_files.sort()
+        if len(image_files) > IMAGE_SAMPLES:
+            step = len(image_files) / IMAGE_SAMPLES
+            image_files = [image_files[int(i * step)] for i in range(IMAGE_SAMPLES)]
+
+        with self._scan_pool(min(IMAGE_SCAN_WORKERS, len(image_files)), "KeyVote") as pool:
+            candidates = [key for key in pool.map(self._key_from_image, image_files) if key]
+
+        if not candidates:
+            return None
+
+        key_hex, votes = Counter(candidates).most_common(1)[0]
+        self.key_confidence = votes / len(candidates)
+        if votes < len(candidates):
+            self.logger.warning(f"Image samples disagree: {votes}/{len(candidates)} voted for the chosen key.")
+        return key_hex
+
+    def _key_from_image(self, path: str) -> Optional[str]:
+        """Candidate key from one encrypted image, or None if its fake header is invalid."""
         try:
-            with open(sample_file, 'rb') as f:
+            with self._open(path) as f:
                 data = f.read(32) # Read first 32 bytes (16 Fake + 16 Encrypted)
             
             crypto = Crypto()
-            if not crypto.verify_fake_header(data):
-                self.logger.warning("Sample image has invalid fake header, skipping derivation.")
+            if len(data) < 32 or not crypto.verify_fake_header(data):
+                self.logger.warning(f"Sample image has invalid fake header, skipping: {path}")
                 return None
             
             encrypted_header = data[16:32]
             png_header = crypto.PNG_HEADER
             
-            key_bytes = bytearray(16)
-            for i in range(16):
-                key_bytes[i] = encrypted_header[i] ^ png_header[i]
+            key_bytes = xor_bytes(encrypted_header, png_header)
             
-            key_hex = binascii.hexlify(key_bytes).decode('utf-8')
-            return key_hex
+            return binascii.hexlify(key_bytes).decode('utf-8')
             
         except Exception as e:
-            self.logger.error(f"Error deriving key from image: {e}")
+            self.logger.error(f"Error deriving key from image {path}: {e}")
             
         return None
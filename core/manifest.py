@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+from .crypto import Crypto
+
+class Manifest:
+    """
+    Persistent record of processed files for incremental runs.
+    Each entry stores the source size/mtime (and optionally a content hash) plus the output size.
+    The whole manifest is tied to a settings fingerprint, so changing the key,
+    the expert header settings or the mode invalidates every entry.
+    Entries are keyed by the source path relative to root (with '/' separators) when root is given,
+    so manifests from machines that mount the input elsewhere (see core.shard) can be merged.
+    """
+    VERSION = 2
+    DEFAULT_NAME = ".rpgm_manifest.json"
+
+    def __init__(self, path: str, fingerprint: str, use_hash: bool = False, root: Optional[str] = None):
+        self.path = path
+        self.root = root
+        self.fingerprint = fingerprint
+        self.use_hash = use_hash
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("Manifest")
+        self.load()
+
+    @staticmethod
+    def settings_fingerprint(crypto: Crypto, mode: str, target_version: str = "mv") -> str:
+        """Fingerprint of everything that affects the output bytes (never stores the key itself)."""
+        parts = [
+            mode,
+            target_version.lower(),
+            crypto.key_hex.lower() if crypto.key_hex else "",
+            str(crypto.header_len),
+            crypto.signature.lower(),
+            crypto.version.lower(),
+            crypto.remain.lower(),
+            str(crypto.ignore_fake_header),
+        ]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        if (data.get("version") != self.VERSION
+                or data.get("fingerprint") != self.fingerprint
+                or data.get("use_hash") != self.use_hash):
+            self.logger.info("Manifest settings changed, rebuilding all outputs.")
+            return
+
+        self.entries = data.get("entries", {})
+
+    def save(self):
+        data = {
+            "version": self.VERSION,
+            "fingerprint": self.fingerprint,
+            "use_hash": self.use_hash,
+            "entries": self.entries,
+        }
+        tmp_path = self.path + ".tmp"
+        try:
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.error(f"Failed to save manifest: {e}")
+
+    def is_up_to_date(self, source_path: str, output_path: str) -> bool:
+        """Checks whether output_path was produced from the current contents of source_path."""
+        with self._lock:
+            entry = self.entries.get(self._key(source_path))
+        if not entry:
+            return False
+
+        try:
+            src_stat = os.stat(source_path)
+            out_stat = os.stat(output_path)
+        except OSError:
+            return False
+
+        if src_stat.st_size != entry["size"] or out_stat.st_size != entry["output_size"]:
+            return False
+
+        if src_stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+
+        # Touched but maybe not changed (checkout, copy): fall back to the content hash
+        if self.use_hash and entry.get("hash") == self._hash_file(source_path):
+            with self._lock:
+                entry["mtime_ns"] = src_stat.st_mtime_ns
+            return True
+
+        return False
+
+    def record(self, source_path: str, output_path: str):
+        """Records a successfully produced output."""
+        src_stat = os.stat(source_path)
+        entry = {
+            "size": src_stat.st_size,
+            "mtime_ns": src_stat.st_mtime_ns,
+            "output_size": os.path.getsize(output_path),
+        }
+        if self.use_hash:
+            entry["hash"] = self._hash_file(source_path)
+
+        with self._lock:
+            self.entries[self._key(source_path)] = entry
+
+    def forget(self, source_path: str):
+        """Drops the entry of a source that no longer exists."""
+        with self._lock:
+            self.entries.pop(self._key(source_path), None)
+
+    def forget_tree(self, source_dir: str):
+        """Drops the entries of every source below a removed directory."""
+        prefix = self._key(source_dir) + ("/" if self.root else os.sep)
+        with self._lock:
+            for key in [k for k in self.entries if k.startswith(prefix)]:
+                del self.entries[key]
+
+    def _key(self, path: str) -> str:
+        if self.root:
+            return os.path.relpath(path, self.root).replace(os.sep, "/")
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                h.update(chunk)
+        return h.hexdigest()
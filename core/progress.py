@@ -0,0 +1,77 @@
+import time
+from collections import deque
+from typing import Callable, Optional
+
+DEFAULT_PROGRESS_RATE = 10.0
+
+class ProgressAggregator:
+    """
+    Coalesces per-file progress into updates emitted at most max_rate times per second.
+    Reports files, bytes, a rolling throughput and a byte-based ETA.
+
+    The callback receives:
+        (files_done, files_total, percent_str, speed_mbps, elapsed, eta_seconds, bytes_done, bytes_total)
+    eta_seconds is None until a throughput is known.
+    """
+    def __init__(self,
+                 callback: Callable,
+                 total_files: int,
+                 total_bytes: int,
+                 max_rate: float = DEFAULT_PROGRESS_RATE,
+                 window: float = 5.0):
+        self.callback = callback
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        # Minimum time between two emitted updates (0 = emit every update)
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        # Rolling throughput window in seconds
+        self.window = window
+
+        self.files_done = 0
+        self.bytes_done = 0
+        self.start_time = time.time()
+        self._last_emit = 0.0
+        self._samples = deque([(self.start_time, 0)])
+
+    def update(self, files: int = 1, nbytes: int = 0):
+        self.files_done += files
+        self.bytes_done += nbytes
+
+        now = time.time()
+        if now - self._last_emit >= self.min_interval:
+            self._emit(now)
+
+    def finish(self):
+        """Emits a final update regardless of the rate limit."""
+        self._emit(time.time())
+
+    def _rolling_speed(self, now: float) -> float:
+        """Rolling throughput in bytes per second over the last `window` seconds."""
+        self._samples.append((now, self.bytes_done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+        t0, b0 = self._samples[0]
+        if now - t0 <= 0:
+            return 0.0
+        return (self.bytes_done - b0) / (now - t0)
+
+    def _eta(self, speed: float) -> Optional[float]:
+        if speed <= 0:
+            return None
+        return max(0.0, (self.total_bytes - self.bytes_done) / speed)
+
+    def _emit(self, now: float):
+        self._last_emit = now
+        speed = self._rolling_speed(now)
+
+        if self.total_bytes > 0:
+            progress = self.bytes_done / self.total_bytes
+        elif self.total_files > 0:
+            progress = self.files_done / self.total_files
+        else:
+            progress = 1.0
+
+        self.callback(self.files_done, self.total_files, f"{int(min(progress, 1.0)*100)}%",
+                      speed / (1024 * 1024), now - self.start_time, self._eta(speed),
+                      self.bytes_done, self.total_bytes)
@@ -0,0 +1,89 @@
+import os
+import time
+import threading
+import logging
+from typing import Callable, Dict, Iterable, List, Set
+
+class FileScanner(threading.Thread):
+    """
+    Discovers files below dropped paths on a background thread using os.scandir,
+    and hands them out in batches so the UI can add them progressively.
+    """
+    def __init__(self,
+                 paths: Iterable[str],
+                 valid_exts: Set[str],
+                 batch_callback: Callable[[List[Dict]], None],
+                 finished_callback: Callable[[int], None],
+                 batch_size: int = 1000,
+                 batch_interval: float = 0.2):
+
+        super().__init__(daemon=True)
+        self.paths = list(paths)
+        self.valid_exts = valid_exts
+        self.batch_callback = batch_callback
+        self.finished_callback = finished_callback
+        # A batch is emitted when it is full or when batch_interval seconds have passed
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+        self._stop_event = threading.Event()
+        self.logger = logging.getLogger("Scanner")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        batch = []
+        total = 0
+        last_emit = time.time()
+
+        for file_info in self._iter_files():
+            if self._stop_event.is_set():
+                return
+            batch.append(file_info)
+            total += 1
+
+            if len(batch) >= self.batch_size or time.time() - last_emit >= self.batch_interval:
+                self.batch_callback(batch)
+                batch = []
+                last_emit = time.time()
+
+        if self._stop_event.is_set():
+            return
+        if batch:
+            self.batch_callback(batch)
+        self.finished_callback(total)
+
+    def _iter_files(self):
+        for path in self.paths:
+            if os.path.isfile(path):
+                if self._is_valid(path):
+                    yield self._make_info(path, os.path.getsize(path))
+            elif os.path.isdir(path):
+                yield from self._scan_dir(path)
+
+    def _scan_dir(self, top: str):
+        stack = [top]
+        while stack:
+            if self._stop_event.is_set():
+                return
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file() and self._is_valid(entry.name):
+                                yield self._make_info(entry.path, entry.stat().st_size)
+                        except OSError as e:
+                            self.logger.warning(f"Skipping {entry.path}: {e}")
+            except OSError as e:
+                self.logger.warning(f"Cannot scan {current}: {e}")
+
+    def _is_valid(self, name: str) -> bool:
+        return os.path.splitext(name)[1].lower() in self.valid_exts
+
+    @staticmethod
+    def _make_info(path: str, size: int) -> Dict:
+        return {'path': path, 'name': os.path.basename(path), 'size': f"{size/1048576:.2f}MB", 'bytes': size, 'status': "Pending"}
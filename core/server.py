@@ -0,0 +1,253 @@
+import os
+import html
+import logging
+import mimetypes
+import threading
+import posixpath
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from .crypto import Crypto, DECRYPT_EXT_MAP
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_MB = 64
+# Encrypted files up to this size are cached fully decrypted; larger ones are read through on each request
+SMALL_FILE_MAX = 256 * 1024
+CHUNK_SIZE = 64 * 1024
+
+class DecryptCache:
+    """Thread-safe LRU of decrypted data, bounded by the total number of cached bytes."""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self.size = 0
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: Tuple, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+class AssetServer(ThreadingHTTPServer):
+    """
+    Serves a game directory over HTTP, decrypting assets on the fly.
+    A request for img/a.png is answered from img/a.rpgmvp (or .png_), audio likewise;
+    every other file is served as-is. Nothing is written to disk.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], root: str, crypto: Crypto,
+                 cache_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.root = os.path.realpath(root)
+        self.crypto = crypto
+        self.cache = DecryptCache(cache_bytes)
+        super().__init__(address, AssetRequestHandler)
+
+    def resolve(self, url_path: str) -> Optional[Tuple[str, bool]]:
+        """Maps a URL path to (file system path, encrypted). Returns None if nothing matches."""
+        parts = [p for p in unquote(urlsplit(url_path).path).split('/') if p and p != '.']
+        # An encoded backslash or drive ("..%5C..", "C:%5C...") would otherwise escape the root on Windows
+        if any(p == '..' or os.sep in p or (os.altsep and os.altsep in p) or os.path.splitdrive(p)[0]
+               for p in parts):
+            return None
+        path = self._within_root(os.path.join(self.root, *parts))
+        if path is None:
+            return None
+        if os.path.exists(path):
+            return path, False
+
+        name_root, ext = os.path.splitext(path)
+        for enc_ext, plain_ext in DECRYPT_EXT_MAP.items():
+            enc_path = self._within_root(name_root + enc_ext)
+            if plain_ext == ext.lower() and enc_path and os.path.isfile(enc_path):
+                return enc_path, True
+        return None
+
+    def _within_root(self, path: str) -> Optional[str]:
+        """The real path of path, or None if it (e.g. through a symlink) lies outside the root."""
+        path = os.path.realpath(path)
+        try:
+            if os.path.commonpath([self.root, path]) != self.root:
+                return None
+        except ValueError:
+            # Different drives
+            return None
+        return path
+
+    def plain_size(self, path: str, st: os.stat_result) -> int:
+        """Size of the decrypted file (the fake header is dropped)."""
+        return max(0, st.st_size - self.crypto.header_len)
+
+    def iter_plain(self, path: str, st: os.stat_result, start: int, length: int) -> Iterator[bytes]:
+        """Yields the decrypted bytes [start, start + length) of an encrypted file."""
+        if st.st_size <= SMALL_FILE_MAX:
+            key = (path, st.st_size, st.st_mtime_ns)
+            data = self.cache.get(key)
+            if data is None:
+                with self.crypto.open_decrypted(path) as f:
+                    data = f.read()
+                self.cache.put(key, data)
+            yield data[start:start + length]
+            return
+
+        # Large files: only the prefix is decrypted, the body is read from the file as requested
+        with self.crypto.open_decrypted(path) as f:
+            f.seek(start)
+            while length > 0:
+                chunk = f.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+def iter_file(path: str, offset: int, length: int) -> Iterator[bytes]:
+    """Yields length bytes of a file from offset, in chunks."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single 'bytes=' range into an inclusive (start, end).
+    Returns None when the header is absent or not a single byte range (the full body is sent),
+    and raises ValueError when the range cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+class AssetRequestHandler(BaseHTTPRequestHandler):
+    server_version = "RPGMDecrypter"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def log_message(self, format, *args):
+        logging.getLogger("Server").info("%s - %s" % (self.address_string(), format % args))
+
+    def _serve(self, send_body: bool):
+        resolved = self.server.resolve(self.path)
+        if resolved is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        path, encrypted = resolved
+
+        if os.path.isdir(path):
+            self._send_listing(path, send_body)
+            return
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        size = self.server.plain_size(path, st) if encrypted else st.st_size
+
+        try:
+            byte_range = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range if byte_range else (0, size - 1)
+        length = max(0, end - start + 1)
+        if encrypted:
+            body = self.server.iter_plain(path, st, start, length)
+            # Fail before the headers go out if the file doesn't decrypt
+            try:
+                first_chunk = next(body, b"")
+            except (OSError, ValueError) as e:
+                self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+                return
+        else:
+            body = iter_file(path, start, length)
+            first_chunk = b""
+
+        plain_name = path
+        if encrypted:
+            name_root, ext = os.path.splitext(path)
+            plain_name = name_root + DECRYPT_EXT_MAP[ext.lower()]
+        self.send_response(HTTPStatus.PARTIAL_CONTENT if byte_range else HTTPStatus.OK)
+        self.send_header("Content-Type", mimetypes.guess_type(plain_name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        if not send_body:
+            return
+        try:
+            if first_chunk:
+                self.wfile.write(first_chunk)
+            for chunk in body:
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # Players cancel requests all the time while seeking
+            pass
+
+    def _send_listing(self, path: str, send_body: bool):
+        """Directory index; encrypted files are listed under their plain names."""
+        rel = os.path.relpath(path, self.server.root)
+        base = "/" if rel == "." else "/" + posixpath.join(*rel.split(os.sep)) + "/"
+        entries = []
+        for entry in sorted(os.scandir(path), key=lambda e: (not e.is_dir(), e.name.lower())):
+            name = entry.name + "/" if entry.is_dir() else entry.name
+            root, ext = os.path.splitext(name)
+            name = root + DECRYPT_EXT_MAP.get(ext.lower(), ext)
+            entries.append(f'<li><a href="{quote(base + name)}">{html.escape(name)}</a></li>')
+
+        body = (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(base)}</title></head>"
+                f"<body><h1>{html.escape(base)}</h1><ul>{''.join(entries)}</ul></body></html>").encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
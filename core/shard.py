@@ -0,0 +1,120 @@
+import os
+import re
+import json
+import glob
+import hashlib
+import logging
+from typing import Dict, List, Tuple
+
+from .manifest import Manifest
+
+SUMMARY_NAME = ".rpgm_shard-{index}-of-{count}.json"
+MANIFEST_NAME = ".rpgm_manifest.shard-{index}-of-{count}.json"
+JOURNAL_NAME = ".rpgm_journal.shard-{index}-of-{count}.jsonl"
+MERGED_SUMMARY_NAME = ".rpgm_summary.json"
+SUMMARY_PATTERN = re.compile(r"^\.rpgm_shard-(\d+)-of-(\d+)\.json$")
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parses 'I/N' (I from 0 to N-1) into (index, count)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected I/N (e.g. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', I must be between 0 and N-1")
+    return index, count
+
+def shard_of(rel_path: str, count: int) -> int:
+    """
+    Shard of a file, from a stable hash of its path relative to the input root.
+    Independent of the machine, OS path separator and Python's hash seed.
+    """
+    key = rel_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big") % count
+
+def select_shard(files: List[Dict], input_root: str, index: int, count: int) -> List[Dict]:
+    """The files of shard index out of count; every file belongs to exactly one shard."""
+    return [f for f in files if shard_of(os.path.relpath(f['path'], input_root), count) == index]
+
+def shard_manifest_path(output_dir: str, index: int, count: int) -> str:
+    """Each shard keeps its own manifest, so processes sharing an output folder don't overwrite each other's."""
+    return os.path.join(output_dir, MANIFEST_NAME.format(index=index, count=count))
+
+def shard_journal_path(output_dir: str, index: int, count: int) -> str:
+    """Per-shard resume journal, for the same reason."""
+    return os.path.join(output_dir, JOURNAL_NAME.format(index=index, count=count))
+
+def write_summary(output_dir: str, index: int, count: int, summary: Dict):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, SUMMARY_NAME.format(index=index, count=count))
+    data = dict(summary, shard=index, shards=count)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+def merge_shards(output_dir: str) -> Dict:
+    """
+    Combines the per-shard summaries (and manifests, if the shards ran incrementally)
+    found in output_dir into .rpgm_summary.json and the regular manifest.
+    Returns the merged summary; 'missing' lists shards that have not reported yet.
+    """
+    summaries = {}
+    counts = set()
+    for path in glob.glob(os.path.join(output_dir, ".rpgm_shard-*-of-*.json")):
+        match = SUMMARY_PATTERN.match(os.path.basename(path))
+        if not match:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            summaries[int(match.group(1))] = json.load(f)
+        counts.add(int(match.group(2)))
+
+    if not summaries:
+        raise ValueError(f"No shard summaries found in {output_dir}")
+    if len(counts) > 1:
+        raise ValueError(f"Shard summaries from different shard counts found: {sorted(counts)}")
+    count = counts.pop()
+
+    merged = {
+        "shards": count,
+        "missing": [i for i in range(count) if i not in summaries],
+        "files": 0, "success": 0, "skipped": 0, "bytes": 0,
+        # Wall time of the slowest shard
+        "seconds": 0.0,
+        "failed": [],
+    }
+    for index in sorted(summaries):
+        summary = summaries[index]
+        for field in ("files", "success", "skipped", "bytes"):
+            merged[field] += summary.get(field, 0)
+        merged["seconds"] = max(merged["seconds"], summary.get("seconds", 0.0))
+        merged["failed"].extend(summary.get("failed", []))
+
+    _merge_manifests(output_dir, count)
+
+    path = os.path.join(output_dir, MERGED_SUMMARY_NAME)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, indent=4)
+    return merged
+
+def _merge_manifests(output_dir: str, count: int):
+    """Unions the shard manifests into output_dir/.rpgm_manifest.json, if they agree on the settings."""
+    shard_data = []
+    for index in range(count):
+        path = shard_manifest_path(output_dir, index, count)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                shard_data.append(json.load(f))
+    if not shard_data:
+        return
+
+    settings = {(d.get("version"), d.get("fingerprint"), d.get("use_hash")) for d in shard_data}
+    if len(settings) > 1:
+        logging.warning("Shard manifests were written with different settings, not merging them.")
+        return
+
+    _, fingerprint, use_hash = settings.pop()
+    manifest = Manifest(os.path.join(output_dir, Manifest.DEFAULT_NAME), fingerprint, use_hash=bool(use_hash))
+    for data in shard_data:
+        manifest.entries.update(data.get("entries", {}))
+    manifest.save()
@@ -0,0 +1,170 @@
+import io
+import os
+import time
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from .utils import atomic_write
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Already-compressed formats (plain and encrypted): stored as-is in zip output
+STORED_EXTS = {".png", ".ogg", ".m4a", ".rpgmvp", ".rpgmvo", ".rpgmvm", ".png_", ".ogg_", ".m4a_"}
+# Outputs up to this size are buffered in memory before they go into an archive, larger ones in a temp file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Output suffix -> tar compression ("" = uncompressed)
+TAR_SUFFIXES = [
+    (".tar.gz", "gz"), (".tgz", "gz"),
+    (".tar.zst", "zst"), (".tzst", "zst"),
+    (".tar.xz", "xz"), (".tar.bz2", "bz2"),
+    (".tar", ""),
+]
+
+def _archive_format(target: str) -> Optional[Tuple[str, str]]:
+    lower = target.lower()
+    if lower.endswith(".zip"):
+        return "zip", ""
+    for suffix, compression in TAR_SUFFIXES:
+        if lower.endswith(suffix):
+            return "tar", compression
+    return None
+
+def is_archive_output(target: str) -> bool:
+    """True if open_sink(target) would write an archive instead of a directory."""
+    return _archive_format(target) is not None
+
+def open_sink(target: str) -> "OutputSink":
+    """Picks the sink from the output path: .zip, .tar[.gz|.zst|.xz|.bz2], otherwise a directory."""
+    archive_format = _archive_format(target)
+    if archive_format is None:
+        return DirectorySink(target)
+    kind, compression = archive_format
+    if kind == "zip":
+        return ZipSink(target)
+    return TarSink(target, compression)
+
+class OutputSink:
+    """
+    Destination for processed files. Files are addressed by their path relative to the output root
+    (the WorkerThread layout), so the same job can write a folder or an archive.
+    """
+    def open(self, rel_path: str, size_hint: int = 0):
+        """Context manager yielding a writable binary stream. The file is discarded if the block raises."""
+        raise NotImplementedError
+
+    def local_path(self, rel_path: str) -> Optional[str]:
+        """On-disk path of an output, or None if the sink does not write plain files."""
+        return None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class DirectorySink(OutputSink):
+    """Writes plain files below root (the default). Each file is renamed into place once complete."""
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, rel_path: str) -> Optional[str]:
+        return os.path.join(self.root, rel_path)
+
+    def open(self, rel_path: str, size_hint: int = 0):
+        path = self.local_path(rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written to a temp file and renamed, so an interrupted run never leaves a truncated output
+        return atomic_write(path)
+
+class ArchiveSink(OutputSink):
+    """
+    Base for single-file archive outputs. Each output is produced into a spool first
+    (memory for small files, a temp file for large ones), then appended to the archive
+    under a lock, so pool threads never interleave members and failed files leave no trace.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+    @contextmanager
+    def open(self, rel_path: str, size_hint: int = 0) -> Iterator[BinaryIO]:
+        spool = io.BytesIO() if size_hint <= SPOOL_MAX_SIZE else tempfile.TemporaryFile()
+        try:
+            yield spool
+            size = spool.seek(0, os.SEEK_END)
+            spool.seek(0)
+            with self._lock:
+                self._add(rel_path.replace(os.sep, "/"), spool, size)
+        finally:
+            spool.close()
+
+    def _add(self, arcname: str, data: BinaryIO, size: int):
+        raise NotImplementedError
+
+class ZipSink(ArchiveSink):
+    """Zip output. Already-compressed media is stored, everything else deflated."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._zip = zipfile.ZipFile(path, "w", allowZip64=True)
+
+    def _add(self, arcname: str, data: BinaryIO, size: int):
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.external_attr = 0o644 << 16
+        info.file_size = size
+        stored = os.path.splitext(arcname)[1].lower() in STORED_EXTS
+        info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+        with self._zip.open(info, "w") as dst:
+            shutil.copyfileobj(data, dst, COPY_CHUNK_SIZE)
+
+    def close(self):
+        with self._lock:
+            self._zip.close()
+
+class TarSink(ArchiveSink):
+    """
+    Tar output, optionally compressed as a whole (gz, xz, bz2, or zst when the zstandard package is installed).
+    Tar headers carry the member size, which is why outputs are spooled before they are added.
+    """
+    def __init__(self, path: str, compression: str = ""):
+        if compression == "zst" and zstandard is None:
+            raise ValueError("Writing .tar.zst requires the 'zstandard' package")
+        super().__init__(path)
+        self._raw = None
+        self._writer = None
+        if compression == "zst":
+            self._raw = open(path, "wb")
+            self._writer = zstandard.ZstdCompressor().stream_writer(self._raw)
+            self._tar = tarfile.open(fileobj=self._writer, mode="w|")
+        else:
+            self._tar = tarfile.open(path, f"w:{compression}" if compression else "w")
+
+    def _add(self, arcname: str, data: BinaryIO, size: int):
+        info = tarfile.TarInfo(arcname)
+        info.size = size
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self._tar.addfile(info, data)
+
+    def close(self):
+        with self._lock:
+            self._tar.close()
+            if self._writer is not None:
+                self._writer.close()
+            if self._raw is not None and not self._raw.closed:
+                self._raw.close()
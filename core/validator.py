@@ -0,0 +1,69 @@
+import os
+import logging
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional
+
+from .crypto import Crypto, DECRYPT_EXT_MAP
+
+DEFAULT_SAMPLES = 3
+
+class KeyValidator:
+    """
+    Fail-early key check: decrypts only the first bytes of a few sampled files per type
+    and compares them with the magic bytes of the plain format (PNG/IHDR, OggS, ftyp).
+    """
+    def __init__(self, crypto: Crypto, samples_per_type: int = DEFAULT_SAMPLES,
+                 opener: Optional[Callable[[str], BinaryIO]] = None):
+        self.crypto = crypto
+        self.samples_per_type = max(1, samples_per_type)
+        # Opens a sample for binary reads (e.g. GameArchive.open for packaged games)
+        self.opener = opener or (lambda path: open(path, 'rb'))
+        self.logger = logging.getLogger("KeyValidator")
+
+    def select_samples(self, paths: Iterable[str]) -> List[str]:
+        """Picks up to samples_per_type files per encrypted type, spread evenly over the list."""
+        by_type: Dict[str, List[str]] = {}
+        for path in paths:
+            ext = os.path.splitext(path)[1].lower()
+            if ext in DECRYPT_EXT_MAP:
+                by_type.setdefault(ext, []).append(path)
+
+        samples = []
+        for type_paths in by_type.values():
+            count = min(self.samples_per_type, len(type_paths))
+            step = len(type_paths) / count
+            samples.extend(type_paths[int(i * step)] for i in range(count))
+        return samples
+
+    def validate(self, paths: Iterable[str]) -> Dict:
+        """
+        Checks the key against sampled files.
+        Returns a dict with 'checked', 'passed' and 'failed' (list of paths).
+        """
+        result = {"checked": 0, "passed": 0, "failed": []}
+        read_len = self.crypto.header_len * 2
+
+        for path in self.select_samples(paths):
+            plain_ext = DECRYPT_EXT_MAP[os.path.splitext(path)[1].lower()]
+            try:
+                with self.opener(path) as f:
+                    data = f.read(read_len)
+            except OSError as e:
+                self.logger.warning(f"Cannot read sample {path}: {e}")
+                continue
+
+            ok = self.crypto.check_sample(data, plain_ext)
+            if ok is None:
+                continue
+
+            result["checked"] += 1
+            if ok:
+                result["passed"] += 1
+            else:
+                result["failed"].append(path)
+
+        return result
+
+    @staticmethod
+    def is_valid(result: Dict) -> bool:
+        """A key is accepted when every sampled file decrypted to the expected magic bytes."""
+        return not result["failed"]
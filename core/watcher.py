@@ -0,0 +1,350 @@
+import os
+import sys
+import time
+import errno
+import queue
+import select
+import shutil
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from .crypto import Crypto, DECRYPT_EXT_MAP, ENCRYPT_EXT_MAP
+from .manifest import Manifest
+from .worker import WorkerThread, output_rel_path
+from .config import DEFAULT_JOBS
+
+# Quiet time after the last event before a burst of saves is processed
+DEFAULT_DEBOUNCE = 0.15
+# Upper bound on how long a continuous stream of events can delay processing
+MAX_BATCH_DELAY = 0.5
+DEFAULT_POLL_INTERVAL = 0.5
+
+# inotify (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class DirectoryWatcher(threading.Thread):
+    """
+    Watches a directory tree and reports changes in debounced batches:
+    callback(changed, deleted), two sets of absolute paths.
+    `changed` may contain a directory (new or moved-in subtree, or the root after an inotify
+    queue overflow), meaning everything below it should be rescanned; `deleted` may contain
+    directories too. Uses inotify on Linux and falls back to polling elsewhere.
+    """
+    def __init__(self,
+                 root: str,
+                 callback: Callable[[Set[str], Set[str]], None],
+                 ignore: Optional[str] = None,
+                 debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_polling: bool = False):
+        super().__init__(daemon=True)
+        self.root = os.path.abspath(root)
+        self.callback = callback
+        # Subtree to ignore (e.g. an output directory inside the watched tree)
+        self.ignore = os.path.abspath(ignore) if ignore else None
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._libc = None if use_polling else _load_libc()
+        self._stop_event = threading.Event()
+        self._changed: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._first_event = None
+        self._last_event = None
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._libc else "polling"
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        if self._libc:
+            try:
+                self._run_inotify()
+                return
+            except OSError as e:
+                logging.getLogger("Watcher").warning(f"inotify unavailable ({e}), falling back to polling.")
+                self._libc = None
+        self._run_polling()
+
+    # --- Batching ---
+
+    def _record(self, path: str, deleted: bool):
+        if self.is_ignored(path):
+            return
+        if deleted:
+            self._changed.discard(path)
+            self._deleted.add(path)
+        else:
+            self._deleted.discard(path)
+            self._changed.add(path)
+        now = time.monotonic()
+        self._first_event = self._first_event or now
+        self._last_event = now
+
+    def _flush_due(self) -> bool:
+        if self._first_event is None:
+            return False
+        now = time.monotonic()
+        return now - self._last_event >= self.debounce or now - self._first_event >= MAX_BATCH_DELAY
+
+    def _flush(self):
+        changed, deleted = self._changed, self._deleted
+        self._changed, self._deleted = set(), set()
+        self._first_event = self._last_event = None
+        self.callback(changed, deleted)
+
+    def is_ignored(self, path: str) -> bool:
+        return self.ignore is not None and (path == self.ignore or path.startswith(self.ignore + os.sep))
+
+    # --- inotify ---
+
+    def _run_inotify(self):
+        fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        watches: Dict[int, str] = {}
+        try:
+            self._add_tree(fd, watches, self.root)
+            buffer = b""
+            while not self._stop_event.is_set():
+                timeout = self.debounce if self._first_event is not None else 0.5
+                readable, _, _ = select.select([fd], [], [], timeout)
+                if readable:
+                    buffer += os.read(fd, 64 * 1024)
+                    buffer = self._parse_events(fd, watches, buffer)
+                if self._flush_due():
+                    self._flush()
+        finally:
+            os.close(fd)
+
+    def _add_tree(self, fd: int, watches: Dict[int, str], top: str):
+        for current, dirs, _ in os.walk(top):
+            if self.is_ignored(current):
+                dirs[:] = []
+                continue
+            wd = self._libc.inotify_add_watch(fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue # Vanished in the meantime
+            watches[wd] = current
+
+    def _parse_events(self, fd: int, watches: Dict[int, str], buffer: bytes) -> bytes:
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+            end = offset + EVENT_HEADER.size + name_len
+            if end > len(buffer):
+                break
+            name = buffer[offset + EVENT_HEADER.size:end].rstrip(b"\0")
+            offset = end
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: rescan everything
+                self._record(self.root, deleted=False)
+                continue
+            if mask & IN_IGNORED:
+                watches.pop(wd, None)
+                continue
+
+            parent = watches.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(fd, watches, path)
+                    self._record(path, deleted=False)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._record(path, deleted=True)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self._record(path, deleted=False)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._record(path, deleted=True)
+        return buffer[offset:]
+
+    # --- Polling ---
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            if self.is_ignored(current):
+                continue
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            st = entry.stat()
+                            snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+        return snapshot
+
+    def _run_polling(self):
+        previous = self._snapshot()
+        # Re-check sooner while a batch is pending, so it is flushed right after it goes quiet
+        while not self._stop_event.wait(self.debounce if self._first_event is not None else self.poll_interval):
+            current = self._snapshot()
+            for path, state in current.items():
+                if previous.get(path) != state:
+                    self._record(path, deleted=False)
+            for path in previous.keys() - current.keys():
+                self._record(path, deleted=True)
+            previous = current
+            # A file still being written shows up again on the next poll; the batch waits for quiet
+            if self._flush_due():
+                self._flush()
+
+class WatchRunner:
+    """
+    Keeps a processing engine resident for a source tree: one initial pass, then every
+    debounced batch of changes is encrypted (or decrypted) through WorkerThread on a shared pool,
+    and outputs of deleted sources are removed. A manifest keeps rescans cheap.
+    """
+    def __init__(self,
+                 input_dir: str,
+                 output_dir: str,
+                 crypto: Crypto,
+                 mode: str = "encrypt",
+                 target_version: str = "mv",
+                 jobs: int = DEFAULT_JOBS,
+                 log_callback: Callable[[str], None] = logging.info,
+                 use_polling: bool = False,
+                 debounce: float = DEFAULT_DEBOUNCE):
+        self.input_dir = os.path.abspath(input_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.crypto = crypto
+        self.mode = mode
+        self.target_version = target_version
+        self.jobs = max(1, jobs)
+        self.log_callback = log_callback
+        self.manifest = Manifest(os.path.join(self.output_dir, Manifest.DEFAULT_NAME),
+                                 Manifest.settings_fingerprint(crypto, mode, target_version), root=self.input_dir)
+        if mode == "encrypt":
+            self.relevant_exts = set(ENCRYPT_EXT_MAP.get(target_version, ENCRYPT_EXT_MAP["mv"]))
+        else:
+            self.relevant_exts = set(DECRYPT_EXT_MAP)
+
+        self.watcher = DirectoryWatcher(self.input_dir, self._enqueue, ignore=self.output_dir,
+                                        debounce=debounce, use_polling=use_polling)
+        self._batches: "queue.Queue[Optional[Tuple[Set[str], Set[str]]]]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._worker: Optional[WorkerThread] = None
+
+    def stop(self):
+        self._stop_event.set()
+        self.watcher.stop()
+        self._batches.put(None)
+        worker = self._worker
+        if worker:
+            worker.stop()
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="Watch") as pool:
+            # Start watching before the initial pass so nothing saved meanwhile is missed
+            self.watcher.start()
+            self.log_callback(f"Watching {self.input_dir} ({self.watcher.backend}), Ctrl-C to stop")
+            self._process(self._collect(self.input_dir), pool)
+
+            while not self._stop_event.is_set():
+                batch = self._batches.get()
+                if batch is None:
+                    break
+                changed, deleted = batch
+                # Merge batches that queued up while the previous one was processed
+                while not self._batches.empty():
+                    more = self._batches.get()
+                    if more is None:
+                        self._stop_event.set()
+                        break
+                    changed = (changed - more[1]) | more[0]
+                    deleted = (deleted - more[0]) | more[1]
+
+                for path in deleted:
+                    self._remove_outputs(path)
+                files = []
+                for path in changed:
+                    files.extend(self._collect(path))
+                if files:
+                    self._process(files, pool)
+                elif deleted:
+                    self.manifest.save()
+
+    def _enqueue(self, changed: Set[str], deleted: Set[str]):
+        self._batches.put((changed, deleted))
+
+    def _collect(self, path: str):
+        """Relevant files at path (a file, or everything below a directory)."""
+        if os.path.isfile(path):
+            paths = [path]
+        else:
+            paths = [os.path.join(root, name) for root, dirs, names in os.walk(path)
+                     if not self.watcher.is_ignored(root) for name in names]
+        return [{'path': p} for p in paths if os.path.splitext(p)[1].lower() in self.relevant_exts]
+
+    def _process(self, files, pool: ThreadPoolExecutor):
+        # Runs synchronously on the runner thread; the file work goes to the resident pool
+        self._worker = WorkerThread(
+            files=files, mode=self.mode, crypto=self.crypto, output_dir=self.output_dir,
+            progress_callback=lambda *args: None, log_callback=self.log_callback,
+            finished_callback=lambda ok, msg: self.log_callback(msg), target_version=self.target_version,
+            jobs=self.jobs, input_root=self.input_dir, manifest=self.manifest, executor=pool
+        )
+        self._worker.run()
+        self._worker = None
+
+    def _remove_outputs(self, path: str):
+        """Removes the output(s) of a deleted source file or directory."""
+        rel_path = os.path.relpath(path, self.input_dir)
+        if rel_path.startswith(os.pardir):
+            return
+        ext = os.path.splitext(path)[1].lower()
+        if ext in self.relevant_exts:
+            target = os.path.join(self.output_dir, output_rel_path(path, self.mode, self.input_dir, self.target_version))
+            self.manifest.forget(path)
+            if os.path.isfile(target):
+                os.remove(target)
+                self.log_callback(f"Removed {os.path.relpath(target, self.output_dir)}")
+        elif os.path.isdir(os.path.join(self.output_dir, rel_path)) and rel_path != os.curdir:
+            # A whole source directory went away
+            self.manifest.forget_tree(path)
+            shutil.rmtree(os.path.join(self.output_dir, rel_path), ignore_errors=True)
+            self.log_callback(f"Removed {rel_path}{os.sep}")
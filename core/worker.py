@@ -1,22 +1,108 @@
 import threading
 import os
+import re
+import json
 import time
+import shutil
 import logging
-from typing import List, Dict, Callable
-from .crypto import Crypto
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Callable, Optional, Tuple
+from .crypto import Crypto, DECRYPT_EXT_MAP, ENCRYPT_EXT_MAP
+from .utils import clone_file, link_file, atomic_path
+from .manifest import Manifest
+from .journal import Journal
+from .sink import OutputSink, DirectorySink
+from .progress import ProgressAggregator, DEFAULT_PROGRESS_RATE
+from .config import DEFAULT_JOBS
 from core.language import get_text
 
+# Planning: files below this size are grouped into batches (one pool task per batch),
+# bigger ones are dispatched individually, largest first
+SMALL_FILE_SIZE = 256 * 1024
+SMALL_BATCH_FILES = 64
+SMALL_BATCH_BYTES = 4 * 1024 * 1024
+# Export mode: System.json flags that make the game look for encrypted assets
+ENCRYPTION_FLAGS = ("hasEncryptedImages", "hasEncryptedAudio")
+ENCRYPTION_FLAG_PATTERN = re.compile(rb'("(?:hasEncryptedImages|hasEncryptedAudio)"\s*:\s*)true')
+
+def clear_encryption_flags(data: bytes) -> Optional[bytes]:
+    """
+    System.json contents with the encryption flags set to false, otherwise unchanged (formatting and all).
+    Returns None if data isn't a JSON object with a flag set, in which case the file should be copied as-is.
+    """
+    try:
+        system = json.loads(data.decode("utf-8-sig"))
+    except ValueError:
+        return None
+    if not isinstance(system, dict) or not any(system.get(flag) is True for flag in ENCRYPTION_FLAGS):
+        return None
+    return ENCRYPTION_FLAG_PATTERN.sub(rb"\1false", data)
+
+def map_extension(ext: str, mode: str, target_version: str = "mv") -> str:
+    """Output extension of a file with extension ext in the given mode."""
+    if mode in ("decrypt", "restore", "export"):
+        return DECRYPT_EXT_MAP.get(ext.lower(), ext)
+    elif mode == "encrypt":
+        ext_map = ENCRYPT_EXT_MAP.get(target_version, ENCRYPT_EXT_MAP["mv"])
+        return ext_map.get(ext.lower(), ext)
+    elif mode == "convert":
+        # Encrypted extension of one version -> the same asset type of the target version
+        plain_ext = DECRYPT_EXT_MAP.get(ext.lower())
+        if plain_ext is None:
+            return ext
+        ext_map = ENCRYPT_EXT_MAP.get(target_version, ENCRYPT_EXT_MAP["mv"])
+        return ext_map[plain_ext]
+    return ext
+
+def relative_path(path: str, input_root: Optional[str] = None) -> str:
+    """
+    Tries to find a meaningful relative path (starting from 'img', 'audio', 'movies').
+    Otherwise returns just the filename.
+    If input_root is set, the path relative to it is used instead.
+    """
+    if input_root:
+        return os.path.relpath(path, input_root)
+
+    parts = path.replace('\\', '/').split('/')
+    keywords = ['img', 'audio', 'movies', 'fonts']
+
+    start_index = -1
+    for i, part in enumerate(parts):
+        if part in keywords:
+            start_index = i
+            break
+
+    if start_index != -1:
+        return os.path.join(*parts[start_index:])
+    else:
+        return os.path.basename(path)
+
+def output_rel_path(input_path: str, mode: str, input_root: Optional[str] = None, target_version: str = "mv") -> str:
+    """Output path (relative to the output directory) of an input file, with the extension mapped for mode."""
+    name_root, ext = os.path.splitext(relative_path(input_path, input_root))
+    return name_root + map_extension(ext, mode, target_version)
+
 class WorkerThread(threading.Thread):
-    def __init__(self, 
-                 files: List[Dict], 
-                 mode: str, 
-                 crypto: Crypto, 
-                 output_dir: str, 
-                 progress_callback: Callable[[int, int, str, float, float], None],
+    def __init__(self,
+                 files: List[Dict],
+                 mode: str,
+                 crypto: Crypto,
+                 output_dir: str,
+                 progress_callback: Callable[[int, int, str, float, float, Optional[float], int, int], None],
                  log_callback: Callable[[str], None],
                  finished_callback: Callable[[bool, str], None],
-                 target_version: str = "mv"):
-        
+                 target_version: str = "mv",
+                 jobs: int = DEFAULT_JOBS,
+                 input_root: Optional[str] = None,
+                 new_key: Optional[str] = None,
+                 manifest: Optional[Manifest] = None,
+                 progress_rate: float = DEFAULT_PROGRESS_RATE,
+                 status_callback: Optional[Callable[[int, str], None]] = None,
+                 executor: Optional[Executor] = None,
+                 sink: Optional[OutputSink] = None,
+                 journal: Optional[Journal] = None,
+                 link_mode: str = "auto"):
+
         super().__init__()
         self.files = files
         self.mode = mode
@@ -26,7 +112,38 @@ class WorkerThread(threading.Thread):
         self.log_callback = log_callback
         self.finished_callback = finished_callback
         self.target_version = target_version.lower()
-        
+        # Number of concurrent I/O workers
+        self.jobs = max(1, int(jobs))
+        # If set, output paths are relative to this directory instead of the img/audio heuristic
+        self.input_root = input_root
+        # Target key for rekey mode
+        self.new_key = new_key
+        # Incremental mode: skip files whose outputs are already up to date
+        self.manifest = manifest
+        # Maximum progress_callback calls per second (see ProgressAggregator)
+        self.progress_rate = progress_rate
+        # Per-file status updates: status_callback(index into files, "Done" / "Error")
+        self.status_callback = status_callback
+        # Shared executor (e.g. one pool across several games). If None, a pool of `jobs` threads is created per run.
+        self.executor = executor
+        # Where outputs go: a directory (default, output_dir) or an archive (see core.sink).
+        # The caller owns the sink and closes it after the run.
+        self.sink = sink or (DirectorySink(output_dir) if output_dir else None)
+        # Resumable jobs: completed files are appended here and skipped when found intact.
+        # Like the sink, it is owned and closed by the caller.
+        self.journal = journal
+        # Export and convert modes: how files are placed (see utils.link_file)
+        self.link_mode = link_mode
+
+        # Run statistics (readable after the thread has finished)
+        self.processed_count = 0
+        self.processed_bytes = 0
+        self.success_count = 0
+        self.skipped_count = 0
+        # Export and convert modes: files placed per method ("reflink" / "hardlink" / "copy" / "rename")
+        self.link_counts: Dict[str, int] = {}
+
+        self._stats_lock = threading.Lock()
         self._stop_event = threading.Event()
         self.logger = logging.getLogger("Worker")
 
@@ -36,8 +153,9 @@ class WorkerThread(threading.Thread):
     def run(self):
         mode_str = get_text(f"mode.{self.mode}")
         self.log_callback(get_text("log.starting", mode_str, len(self.files)))
-        
-        if not os.path.exists(self.output_dir):
+
+        # Rekey mode without an output directory works in place
+        if self.output_dir and not os.path.exists(self.output_dir):
             try:
                 os.makedirs(self.output_dir)
             except OSError as e:
@@ -45,109 +163,339 @@ class WorkerThread(threading.Thread):
                 return
 
         total_files = len(self.files)
-        processed_count = 0
-        processed_bytes = 0
-        success_count = 0
         start_time = time.time()
-        
-        # Determine common prefix to preserve structure
-        # Simple heuristic: use the directory of the first file as base?
-        # Or just flatten if not sure.
-        # Better: For each file, if it's inside a 'img' or 'audio' folder, try to keep that structure.
-        
-        for file_info in self.files:
-            if self._stop_event.is_set():
-                self.log_callback(get_text("log.cancelled"))
-                break
-                
-            input_path = file_info['path']
-            
-            try:
-                # 1. Determine Output Path
-                # Strategy: If path contains "img" or "audio", start relative path from there.
-                # Else, just use filename.
-                rel_path = self._get_relative_path(input_path)
-                
-                # Determine extension change
-                filename = os.path.basename(rel_path)
-                file_dir = os.path.dirname(rel_path)
-                
-                name_root, ext = os.path.splitext(filename)
-                new_ext = ext
-                
-                if self.mode == "decrypt" or self.mode == "restore":
-                    if ext == ".rpgmvp": new_ext = ".png"
-                    elif ext == ".rpgmvm": new_ext = ".m4a"
-                    elif ext == ".rpgmvo": new_ext = ".ogg"
-                    elif ext == ".png_": new_ext = ".png"
-                    elif ext == ".m4a_": new_ext = ".m4a"
-                    elif ext == ".ogg_": new_ext = ".ogg"
-                
-                elif self.mode == "encrypt":
-                    if self.target_version == "mz":
-                        if ext == ".png": new_ext = ".png_"
-                        elif ext == ".m4a": new_ext = ".m4a_"
-                        elif ext == ".ogg": new_ext = ".ogg_"
-                    else: # mv
-                        if ext == ".png": new_ext = ".rpgmvp"
-                        elif ext == ".m4a": new_ext = ".rpgmvm"
-                        elif ext == ".ogg": new_ext = ".rpgmvo"
-                
-                output_subdir = os.path.join(self.output_dir, file_dir)
-                if not os.path.exists(output_subdir):
-                    os.makedirs(output_subdir, exist_ok=True)
-                    
-                output_path = os.path.join(output_subdir, name_root + new_ext)
-                
-                # 2. Process
-                file_size = os.path.getsize(input_path)
-                processed_bytes += file_size
-
-                with open(input_path, "rb") as f_in, open(output_path, "wb") as f_out:
-                    if self.mode == "decrypt":
+        tasks, total_bytes = self.plan()
+        progress = ProgressAggregator(self.progress_callback, total_files, total_bytes, self.progress_rate)
+
+        # Planned tasks are handed to a pool of I/O workers. Results are collected here,
+        # on the worker thread, so progress is aggregated without extra locking.
+        # Only a bounded window of tasks is in flight, so several WorkerThreads
+        # sharing one executor interleave instead of queueing behind each other.
+        pool = self.executor or ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="Worker")
+        window = self.jobs * 2
+        pending = {}
+        queue = iter(tasks)
+        try:
+            for task in queue:
+                pending[pool.submit(self._process_task, task)] = task
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
+                    for (index, _, _), result in zip(task, future.result()):
+                        self._handle_result(index, result, progress)
+
+                    if self._stop_event.is_set():
+                        continue
+                    next_task = next(queue, None)
+                    if next_task is not None:
+                        pending[pool.submit(self._process_task, next_task)] = next_task
+        finally:
+            if pool is not self.executor:
+                pool.shutdown()
+
+        progress.finish()
+
+        if self._stop_event.is_set():
+            self.log_callback(get_text("log.cancelled"))
+
+        if self.manifest:
+            self.manifest.save()
+        if self.skipped_count:
+            self.log_callback(get_text("log.skipped", self.skipped_count))
+
+        total_time = time.time() - start_time
+        self.finished_callback(True, get_text("log.finished", self.processed_count, self.success_count, f"{total_time:.2f}"))
+
+    def _handle_result(self, index: int, result: Optional[Tuple[str, int]], progress: ProgressAggregator):
+        if result is None:
+            # Skipped because the job was cancelled
+            return
+
+        status, file_size = result
+        self.processed_count += 1
+        self.processed_bytes += file_size
+        if status == "success":
+            self.success_count += 1
+        elif status == "skipped":
+            self.skipped_count += 1
+
+        if self.status_callback:
+            self.status_callback(index, "Error" if status == "error" else "Done")
+
+        # Update Progress (rate-limited)
+        progress.update(1, file_size)
+
+    def plan(self) -> Tuple[List[List[Tuple[int, Dict, int]]], int]:
+        """
+        Stats every file once and orders the work. Large files come first, one task each and
+        largest first, so a big BGM file doesn't start last and keep one thread busy while the
+        others idle; small files follow in batches, so thousands of icons don't cost a task each.
+        Returns (tasks, total_bytes); a task is a list of (index into files, file_info, size).
+        """
+        sized = [(index, file_info, self._file_size(file_info)) for index, file_info in enumerate(self.files)]
+        sized.sort(key=lambda item: item[2], reverse=True)
+
+        large = [item for item in sized if item[2] >= SMALL_FILE_SIZE]
+        small = sized[len(large):]
+        # Keep enough small batches around to give every thread work
+        batch_files = max(1, min(SMALL_BATCH_FILES, -(-len(small) // (self.jobs * 4))))
+
+        tasks = [[item] for item in large]
+        batch, batch_bytes = [], 0
+        for item in small:
+            batch.append(item)
+            batch_bytes += item[2]
+            if len(batch) >= batch_files or batch_bytes >= SMALL_BATCH_BYTES:
+                tasks.append(batch)
+                batch, batch_bytes = [], 0
+        if batch:
+            tasks.append(batch)
+
+        return tasks, sum(item[2] for item in sized)
+
+    @staticmethod
+    def _file_size(file_info: Dict) -> int:
+        if 'bytes' in file_info:
+            return file_info['bytes']
+        try:
+            if 'archive' in file_info:
+                return file_info['archive'].getsize(file_info['path'])
+            return os.path.getsize(file_info['path'])
+        except OSError:
+            return 0
+
+    def _process_task(self, task: List[Tuple[int, Dict, int]]) -> List[Optional[Tuple[str, int]]]:
+        """Processes one planned task (a single large file or a batch of small ones). Runs on a pool thread."""
+        return [self._process_file(file_info, size) for _, file_info, size in task]
+
+    def _process_file(self, file_info: Dict, planned_size: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """
+        Processes a single file (planned_size: its size from the plan, if known). Runs on a pool thread.
+        Returns (status, file_size) with status "success", "skipped" or "error",
+        or None if the job was cancelled before the file was started.
+        """
+        if self._stop_event.is_set():
+            return None
+
+        input_path = file_info['path']
+        # Set for files inside a packaged game (see core.archive); path is then a virtual member path
+        archive = file_info.get('archive')
+        file_size = 0
+
+        try:
+            if self.mode == "rekey":
+                if archive:
+                    raise ValueError("Files inside an archive cannot be rekeyed in place")
+                file_size = planned_size if planned_size is not None else os.path.getsize(input_path)
+                target_path = self._rekey_target(input_path)
+                source_rel = self._get_relative_path(input_path)
+                # Rekeying in place twice would scramble the file, so resuming matters most here
+                if self.journal and self.journal.is_done(source_rel, file_size, target_path):
+                    return "skipped", file_size
+                self._rekey_file(input_path, target_path)
+                if self.journal:
+                    self.journal.record(source_rel, file_size, target_path)
+                return "success", file_size
+
+            if self.mode == "convert":
+                file_size = planned_size if planned_size is not None else (
+                    archive.getsize(input_path) if archive else os.path.getsize(input_path))
+                return self._convert_file(input_path, archive, file_size), file_size
+
+            # 1. Determine Output Path (None if the sink writes into an archive)
+            rel_path = self.output_rel_path(input_path)
+            output_path = self.sink.local_path(rel_path)
+            # The manifest compares real files on both sides
+            use_manifest = self.manifest is not None and output_path is not None and not archive
+            use_journal = self.journal is not None and output_path is not None
+            source_rel = self._get_relative_path(input_path)
+
+            # 2. Process
+            if planned_size is not None:
+                file_size = planned_size
+            else:
+                file_size = archive.getsize(input_path) if archive else os.path.getsize(input_path)
+
+            if use_journal and self.journal.is_done(source_rel, file_size, output_path):
+                return "skipped", file_size
+            if use_manifest and self.manifest.is_up_to_date(input_path, output_path):
+                return "skipped", file_size
+
+            if self.mode == "export" and os.path.splitext(input_path)[1].lower() not in DECRYPT_EXT_MAP:
+                self._export_plain_file(input_path, archive, rel_path, output_path, file_size)
+            else:
+                # Archive members are streamed straight out of the archive, without an extracted copy
+                f_in = archive.open(input_path) if archive else open(input_path, "rb")
+                with f_in, self.sink.open(rel_path, file_size) as f_out:
+                    if self.mode == "decrypt" or self.mode == "export":
                         self.crypto.decrypt_stream(f_in, f_out)
                     elif self.mode == "restore":
                         self.crypto.restore_png_header_stream(f_in, f_out)
                     elif self.mode == "encrypt":
-                        self.crypto.encrypt_stream(f_in, f_out) 
+                        self.crypto.encrypt_stream(f_in, f_out)
                     else:
                         raise ValueError(f"Unknown mode: {self.mode}")
-                    
-                success_count += 1
-                self.log_callback(get_text("log.success", filename, os.path.basename(output_path)))
-                
-            except Exception as e:
-                self.log_callback(get_text("log.processError", os.path.basename(input_path), str(e)))
-            
-            # 3. Update Progress
-            processed_count += 1
-            elapsed = time.time() - start_time
-            
-            speed_mbps = 0.0
-            if elapsed > 0:
-                speed_mbps = (processed_bytes / (1024 * 1024)) / elapsed
-
-            progress = processed_count / total_files
-            self.progress_callback(processed_count, total_files, f"{int(progress*100)}%", speed_mbps, elapsed)
 
-        total_time = time.time() - start_time
-        self.finished_callback(True, get_text("log.finished", processed_count, success_count, f"{total_time:.2f}"))
+            if use_manifest:
+                self.manifest.record(input_path, output_path)
+            if use_journal:
+                self.journal.record(source_rel, file_size, output_path)
 
-    def _get_relative_path(self, path: str) -> str:
+            self.log_callback(get_text("log.success", os.path.basename(input_path), os.path.basename(rel_path)))
+            return "success", file_size
+
+        except Exception as e:
+            self.log_callback(get_text("log.processError", os.path.basename(input_path), str(e)))
+            return "error", file_size
+
+    def _export_plain_file(self, input_path: str, archive, rel_path: str, output_path: Optional[str], file_size: int):
+        """
+        Export mode, unencrypted file: placed with a reflink or hardlink when possible (see link_mode),
+        copied otherwise. System.json gets its encryption flags cleared so the exported project loads
+        the decrypted assets.
+        """
+        if os.path.basename(rel_path) == "System.json" and self._export_system_json(input_path, archive, rel_path, file_size):
+            method = "copy"
+        elif archive or output_path is None:
+            # Archive members have no file to link to, archive outputs no file to link from
+            f_in = archive.open(input_path) if archive else open(input_path, "rb")
+            with f_in, self.sink.open(rel_path, file_size) as f_out:
+                shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+            method = "copy"
+        elif os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            # Hardlinked by an earlier export
+            method = "hardlink"
+        else:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with atomic_path(output_path) as tmp_path:
+                method = link_file(input_path, tmp_path, self.link_mode)
+
+        self._count_link(method)
+
+    def _export_system_json(self, input_path: str, archive, rel_path: str, file_size: int) -> bool:
+        """Writes System.json with the encryption flags cleared. Returns False if it has none to clear (or can't be parsed)."""
+        with (archive.open(input_path) if archive else open(input_path, "rb")) as f_in:
+            patched = clear_encryption_flags(f_in.read())
+        if patched is None:
+            return False
+        with self.sink.open(rel_path, file_size) as f_out:
+            f_out.write(patched)
+        return True
+
+    def _convert_file(self, input_path: str, archive, file_size: int) -> str:
+        """
+        Convert mode: gives an encrypted file the target version's extension. The encrypted bytes
+        are the same for MV and MZ, so without new_key this is a rename (in place) or a link (see link_mode);
+        with new_key only the encrypted prefix is rewritten, on a reflink or copy, never on a hardlink.
+        Returns "success" or "skipped".
         """
-        Tries to find a meaningful relative path (starting from 'img', 'audio', 'movies').
-        Otherwise returns just the filename.
+        rel_path = self.output_rel_path(input_path)
+        if not self.sink:
+            return self._convert_in_place(input_path)
+
+        output_path = self.sink.local_path(rel_path)
+        source_rel = self._get_relative_path(input_path)
+        if self.journal and output_path and self.journal.is_done(source_rel, file_size, output_path):
+            return "skipped"
+
+        if archive or output_path is None:
+            # No files to link on one side: stream, rekeying the prefix on the way
+            head_len = self.crypto.header_len * 2
+            f_in = archive.open(input_path) if archive else open(input_path, "rb")
+            with f_in, self.sink.open(rel_path, file_size) as f_out:
+                head = f_in.read(head_len)
+                f_out.write(self.crypto.rekey(head, self.new_key) if self.new_key else head)
+                shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+            method = "copy"
+        elif not self.new_key and os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            method = "hardlink"
+        else:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            link_mode = self.link_mode
+            if self.new_key:
+                # The prefix is rewritten in place, which must not reach the source through a shared inode
+                link_mode = "copy" if link_mode == "copy" else "reflink"
+            with atomic_path(output_path) as tmp_path:
+                method = link_file(input_path, tmp_path, link_mode)
+                if self.new_key:
+                    with open(tmp_path, "r+b") as f:
+                        self.crypto.rekey_stream(f, self.new_key)
+
+        if self.journal and output_path:
+            self.journal.record(source_rel, file_size, output_path)
+        self._count_link(method)
+        self.log_callback(get_text("log.success", os.path.basename(input_path), os.path.basename(rel_path)))
+        return "success"
+
+    def _convert_in_place(self, input_path: str) -> str:
+        """
+        Convert mode without an output directory: renames the file, then rekeys it if requested.
+        Journaled under the new name, so a resumed run neither renames nor rekeys a file twice.
+        """
+        name_root, ext = os.path.splitext(input_path)
+        target_path = name_root + self._map_extension(ext)
+        target_rel = self._get_relative_path(target_path)
+        if self.journal and os.path.exists(target_path) and self.journal.is_done(
+                target_rel, os.path.getsize(target_path), target_path):
+            return "skipped"
+
+        if target_path != input_path:
+            if os.path.exists(target_path):
+                raise FileExistsError(f"{os.path.basename(target_path)} already exists")
+            os.rename(input_path, target_path)
+        elif not self.new_key:
+            # Already named for the target version
+            return "skipped"
+        if self.new_key:
+            with open(target_path, "r+b") as f:
+                self.crypto.rekey_stream(f, self.new_key)
+
+        if self.journal:
+            self.journal.record(target_rel, os.path.getsize(target_path), target_path)
+        self._count_link("rename")
+        self.log_callback(get_text("log.success", os.path.basename(input_path), os.path.basename(target_path)))
+        return "success"
+
+    def _count_link(self, method: str):
+        with self._stats_lock:
+            self.link_counts[method] = self.link_counts.get(method, 0) + 1
+
+    def _rekey_target(self, input_path: str) -> str:
+        """File rekey mode writes: the copy in the output directory, or input_path itself when working in place."""
+        if not self.sink:
+            return input_path
+        target_path = self.sink.local_path(self.output_rel_path(input_path))
+        if target_path is None:
+            raise ValueError("Rekey mode needs a directory output")
+        return target_path
+
+    def _rekey_file(self, input_path: str, target_path: str):
         """
-        parts = path.replace('\\', '/').split('/')
-        keywords = ['img', 'audio', 'movies', 'fonts']
-        
-        start_index = -1
-        for i, part in enumerate(parts):
-            if part in keywords:
-                start_index = i
-                break
-        
-        if start_index != -1:
-            return os.path.join(*parts[start_index:])
+        Rewrites the encrypted prefix with new_key, in place or on a (copy-on-write) copy in the output directory.
+        The copy is rekeyed under a temp name and renamed into place once complete.
+        """
+        if target_path == input_path:
+            with open(target_path, "r+b") as f:
+                self.crypto.rekey_stream(f, self.new_key)
         else:
-            return os.path.basename(path)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            with atomic_path(target_path) as tmp_path:
+                clone_file(input_path, tmp_path)
+                with open(tmp_path, "r+b") as f:
+                    self.crypto.rekey_stream(f, self.new_key)
+
+        self.log_callback(get_text("log.success", os.path.basename(input_path), os.path.basename(target_path)))
+
+    def output_rel_path(self, input_path: str) -> str:
+        """Returns the output path (relative to output_dir) for an input file, with the extension mapped for the current mode."""
+        return output_rel_path(input_path, self.mode, self.input_root, self.target_version)
+
+    def _map_extension(self, ext: str) -> str:
+        return map_extension(ext, self.mode, self.target_version)
+
+    def _get_relative_path(self, path: str) -> str:
+        return relative_path(path, self.input_root)
@@ -14,8 +14,12 @@ from PIL import Image
 from core.crypto import Crypto
 from core.worker import WorkerThread
 from core.key_finder import KeyFinder
+from core.validator import KeyValidator
+from core.scanner import FileScanner
+from core.utils import format_eta
+from gui.file_list import VirtualFileList
 from core.language import init_language, get_text, get_all_languages, set_current_language
-from core.config import get_config
+from core.config import get_config, DEFAULT_JOBS
 
 # --- Design System Constants ---
 COLORS = {
@@ -96,6 +100,8 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         
         # --- Data & State ---
         self.files = []
+        self.file_index = set() # Paths in self.files, for O(1) duplicate checks
+        self.scanners = []
         self.current_mode = "decrypt"
         self.target_version = ctk.StringVar(value="mv")
         self.is_running = False
@@ -108,6 +114,7 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.header_ver_var = ctk.StringVar(value=es.get("header_ver", "000301"))
         self.header_rem_var = ctk.StringVar(value=es.get("header_rem", "0000000000"))
         self.ignore_fake_header_var = ctk.BooleanVar(value=es.get("ignore_fake_header", False))
+        self.jobs_var = ctk.StringVar(value=str(self.config.jobs))
         
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
@@ -225,7 +232,7 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         if self.is_running: return
 
         self.current_mode = name
-        self.files = [] # Reset files
+        self._reset_files()
         
         # Update Sidebar State
         for key, btn in self.nav_buttons.items():
@@ -246,7 +253,8 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             
         # Clear references to destroyed widgets to prevent access errors
         self.key_entry = None
-        self.file_scroll = None 
+        self.file_list = None 
+        self.status_label = None
 
         # Render Content
         if name == "decrypt":
@@ -354,17 +362,16 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             ctk.CTkLabel(input_row, text=get_text("ui.ver"), font=self.main_font).pack(side="left", padx=(20, 5))
             ctk.CTkSegmentedButton(input_row, values=["mv", "mz"], variable=self.target_version).pack(side="left")
 
-        # 4. File List (Scrollable)
-        self.file_scroll = ctk.CTkScrollableFrame(
+        # 4. File List (Virtualized: a fixed pool of rows rebound while scrolling)
+        self.file_list = VirtualFileList(
             container, 
-            label_text=None, 
+            font=self.main_font,
             fg_color="transparent",
             border_width=1, 
             border_color=(COLORS["border"]["light"], COLORS["border"]["dark"]),
             corner_radius=8
         )
-        self.file_scroll.grid(row=3, column=0, sticky="nsew", pady=(0, 20))
-        # (Headers and refresh logic handled in refresh_file_list)
+        self.file_list.grid(row=3, column=0, sticky="nsew", pady=(0, 20))
 
         # 5. Bottom Action Bar
         action_bar = ctk.CTkFrame(container, fg_color="transparent")
@@ -432,6 +439,8 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         row.pack(fill="x", pady=5)
         ctk.CTkCheckBox(row, text=get_text("enDecrypt.label.verifyHeader.no"), variable=self.ignore_fake_header_var).pack(side="left", padx=(150, 0))
 
+        add_setting_row(get_text("ui.jobs"), self.jobs_var)
+
     # --- Logic Implementations ---
 
     def drop_event(self, event):
@@ -444,34 +453,45 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         else: # encrypt
              valid_exts = {'.png', '.m4a', '.ogg'}
         
-        for p in paths:
-            if os.path.isfile(p): self._add_file(p, valid_exts)
-            elif os.path.isdir(p):
-                for root, _, files in os.walk(p):
-                    for f in files: self._add_file(os.path.join(root, f), valid_exts)
-        self.refresh_file_list()
-
-    def _add_file(self, path, valid_exts):
-        ext = os.path.splitext(path)[1].lower()
-        if ext in valid_exts and not any(f['path'] == path for f in self.files):
-            self.files.append({'path': path, 'name': os.path.basename(path), 'size': f"{os.path.getsize(path)/1048576:.2f}MB", 'status': "Pending"})
+        # Discovery runs in the background; batches are added on the Tk thread as they arrive
+        scanner = FileScanner(
+            paths, valid_exts,
+            batch_callback=lambda batch: self.after(0, lambda: self._add_batch(scanner, batch)),
+            finished_callback=lambda total: self.after(0, lambda: self._on_scan_finished(scanner))
+        )
+        self.scanners.append(scanner)
+        scanner.start()
+
+    def _add_batch(self, scanner, batch):
+        if scanner not in self.scanners: return # Stale batch from a cancelled scan
+        added = 0
+        for f in batch:
+            if f['path'] not in self.file_index:
+                self.file_index.add(f['path'])
+                self.files.append(f)
+                added += 1
+        if added:
+            self.refresh_file_list()
+            if self.status_label is not None:
+                self.status_label.configure(text=get_text("status.addedFiles", len(self.files)))
+
+    def _on_scan_finished(self, scanner):
+        if scanner in self.scanners:
+            self.scanners.remove(scanner)
+
+    def _reset_files(self):
+        for scanner in self.scanners:
+            scanner.stop()
+        self.scanners = []
+        self.files = []
+        self.file_index = set()
 
     def refresh_file_list(self):
-        if not hasattr(self, 'file_scroll'): return
-        for w in self.file_scroll.winfo_children(): w.destroy()
-        
-        if not self.files:
-            ctk.CTkLabel(self.file_scroll, text=get_text("status.noFiles"), text_color="gray").pack(pady=20)
-            return
-
-        for f in self.files[:50]: # Render limit
-            row = ctk.CTkFrame(self.file_scroll, fg_color="transparent")
-            row.pack(fill="x", pady=2)
-            ctk.CTkLabel(row, text=f['name'], anchor="w", width=300).pack(side="left", padx=5)
-            ctk.CTkLabel(row, text=f['size'], anchor="e", width=80).pack(side="right", padx=5)
+        if getattr(self, 'file_list', None) is None: return
+        self.file_list.set_items(self.files)
 
     def clear_files(self):
-        self.files = []
+        self._reset_files()
         self.refresh_file_list()
 
     def toggle_theme(self):
@@ -504,9 +524,9 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             threading.Thread(target=lambda: self._run_detection(game_dir), daemon=True).start()
 
     def _run_detection(self, game_dir):
-        finder = KeyFinder(game_dir)
         try:
-            key = finder.find_key()
+            with KeyFinder(game_dir) as finder:
+                key = finder.find_key()
             self.after(0, lambda: self._on_key(key))
         except: pass
     
@@ -549,19 +569,46 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             # ... (Assign other props)
         except: return
 
+        # Fail early on a wrong key instead of writing garbage files
+        if self.current_mode == "decrypt":
+            result = KeyValidator(crypto).validate(f['path'] for f in self.files)
+            if not KeyValidator.is_valid(result):
+                self.status_label.configure(text=get_text("status.keyInvalid", len(result["failed"]), result["checked"]))
+                return
+
         self.is_running = True
         self.start_btn.configure(text=get_text("ui.cancel"), fg_color="orange")
+        for f in self.files: f['status'] = "Pending"
+        self.refresh_file_list()
         
         self.worker = WorkerThread(
-            files=self.files, mode=self.current_mode, crypto=crypto, 
+            files=list(self.files), mode=self.current_mode, crypto=crypto, 
             output_dir=os.path.join(os.getcwd(), "Output"),
             progress_callback=self._on_progress, log_callback=lambda m: None,
-            finished_callback=self._on_finish, target_version=self.target_version.get()
+            finished_callback=self._on_finish, target_version=self.target_version.get(),
+            jobs=self._get_jobs(), status_callback=self._on_file_status
         )
         self.worker.start()
 
-    def _on_progress(self, cur, total, pct, speed, elapsed):
-        self.after(0, lambda: self.status_label.configure(text=get_text("status.processing_simple", pct, f"{speed:.1f} MB/s")))
+    def _get_jobs(self):
+        try:
+            return max(1, int(self.jobs_var.get()))
+        except ValueError:
+            return DEFAULT_JOBS
+
+    def _on_file_status(self, index, status):
+        # Worker thread: only update the shared dict, rows are redrawn with the next progress tick
+        self.worker.files[index]['status'] = status
+
+    def _on_progress(self, cur, total, pct, speed, elapsed, eta, done_bytes, total_bytes):
+        # Called at most progress_rate times per second by the worker
+        detail = f"{speed:.1f} MB/s, {get_text('status.eta', format_eta(eta))}"
+        self.after(0, lambda: self._update_progress_ui(get_text("status.processing_simple", pct, detail)))
+
+    def _update_progress_ui(self, text):
+        self.status_label.configure(text=text)
+        if self.file_list is not None:
+            self.file_list.refresh()
 
     def _on_finish(self, success, msg):
         self.after(0, lambda: self._finish_ui(msg))
@@ -570,8 +617,11 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.is_running = False
         self.start_btn.configure(text=get_text("button.start"), fg_color=(COLORS["primary"]["light"], COLORS["primary"]["dark"]))
         self.status_label.configure(text=get_text("status.done", msg))
+        if self.file_list is not None:
+            self.file_list.refresh()
 
     def on_closing(self):
+        self.config.jobs = self._get_jobs()
         self.config.save()
         self.destroy()
 
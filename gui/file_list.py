@@ -0,0 +1,145 @@
+import sys
+import customtkinter as ctk
+
+from core.language import get_text
+
+# Row status -> language key
+STATUS_KEYS = {
+    "Pending": "status.pending",
+    "Done": "status.fileDone",
+    "Error": "status.fileError",
+}
+
+class VirtualFileList(ctk.CTkFrame):
+    """
+    File list that keeps a fixed pool of row widgets (one per visible line)
+    and rebinds them to a window of the item list while scrolling.
+    Refreshing costs the same for 50 or 50,000 files.
+    """
+    def __init__(self, master, font=None, row_height=28, **kwargs):
+        super().__init__(master, **kwargs)
+        self.font = font
+        self.row_height = row_height
+        self.items = []
+        self.offset = 0
+        self.rows = [] # (frame, name_label, status_label, size_label, bound_state)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew", padx=(6, 0), pady=6)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns", pady=6)
+
+        self.empty_label = ctk.CTkLabel(self.viewport, text=get_text("status.noFiles"), text_color="gray")
+
+        self.viewport.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.viewport)
+
+    # --- Public API ---
+
+    def set_items(self, items):
+        """Binds the list to items (a list of file dicts) and redraws the visible rows."""
+        self.items = items
+        self._clamp_offset()
+        self.refresh()
+
+    def refresh(self):
+        """Re-renders the visible rows only. Cheap enough to call at progress rate."""
+        if not self.items:
+            self.empty_label.place(relx=0.5, y=20, anchor="n")
+        else:
+            self.empty_label.place_forget()
+
+        for position, row in enumerate(self.rows):
+            self._bind_row(row, position, self.offset + position)
+        self._update_scrollbar()
+
+    # --- Internals ---
+
+    def _visible_count(self):
+        return max(1, self.viewport.winfo_height() // self.row_height)
+
+    def _on_resize(self, event):
+        needed = max(1, event.height // self.row_height)
+        while len(self.rows) < needed:
+            self.rows.append(self._create_row())
+        self._clamp_offset()
+        self.refresh()
+
+    def _create_row(self):
+        frame = ctk.CTkFrame(self.viewport, fg_color="transparent", height=self.row_height)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_propagate(False)
+        name_label = ctk.CTkLabel(frame, text="", anchor="w", font=self.font)
+        name_label.grid(row=0, column=0, sticky="ew", padx=5)
+        status_label = ctk.CTkLabel(frame, text="", anchor="e", width=80, font=self.font)
+        status_label.grid(row=0, column=1, padx=5)
+        size_label = ctk.CTkLabel(frame, text="", anchor="e", width=80, font=self.font)
+        size_label.grid(row=0, column=2, padx=5)
+        for w in (frame, name_label, status_label, size_label):
+            self._bind_wheel(w)
+        return [frame, name_label, status_label, size_label, None]
+
+    def _bind_row(self, row, position, index):
+        frame, name_label, status_label, size_label, bound = row
+
+        if index >= len(self.items) or position >= self._visible_count():
+            if bound is not None:
+                frame.place_forget()
+                row[4] = None
+            return
+
+        item = self.items[index]
+        state = (index, item['name'], item.get('status', "Pending"), item['size'])
+        if state == bound:
+            return # Nothing changed, skip the Tk calls
+
+        if bound is None:
+            frame.place(x=0, y=position * self.row_height, relwidth=1)
+        if bound is None or bound[1] != state[1]:
+            name_label.configure(text=state[1])
+        if bound is None or bound[2] != state[2]:
+            status_label.configure(text=get_text(STATUS_KEYS.get(state[2], "status.pending")))
+        if bound is None or bound[3] != state[3]:
+            size_label.configure(text=state[3])
+        row[4] = state
+
+    def _clamp_offset(self):
+        max_offset = max(0, len(self.items) - self._visible_count())
+        self.offset = min(max(0, self.offset), max_offset)
+
+    def _scroll_to(self, offset):
+        self.offset = int(offset)
+        self._clamp_offset()
+        self.refresh()
+
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if total == 0:
+            self.scrollbar.set(0, 1)
+            return
+        visible = self._visible_count()
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(float(args[0]) * len(self.items))
+        elif action == "scroll":
+            amount = int(args[0])
+            if len(args) > 1 and args[1] == "pages":
+                amount *= self._visible_count()
+            self._scroll_to(self.offset + amount)
+
+    def _bind_wheel(self, widget):
+        if sys.platform.startswith("linux"):
+            widget.bind("<Button-4>", lambda e: self._scroll_to(self.offset - 3))
+            widget.bind("<Button-5>", lambda e: self._scroll_to(self.offset + 3))
+        else:
+            widget.bind("<MouseWheel>", self._on_wheel)
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self._scroll_to(self.offset - step * 3)
@@ -2,8 +2,25 @@ import argparse
 import os
 import sys
 import logging
-from core.crypto import Crypto
+import time
+import threading
+from contextlib import nullcontext
+from core.crypto import Crypto, DECRYPT_EXT_MAP, ENCRYPT_EXT_MAP
 from core.key_finder import KeyFinder
+from core.worker import WorkerThread
+from core.language import init_language
+from core.config import get_config, DEFAULT_JOBS
+from core.utils import peak_memory_mb, clone_file, format_eta, atomic_write, atomic_path, LINK_MODES
+from core.manifest import Manifest
+from core.journal import Journal
+from core.validator import KeyValidator, DEFAULT_SAMPLES
+from core.batch import BatchRunner, find_games, read_game_list
+from core.key_cache import get_key_cache
+from core.archive import GameArchive, is_archive
+from core.sink import OutputSink, open_sink, is_archive_output
+from core.server import AssetServer, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_CACHE_MB
+from core.watcher import WatchRunner
+from core.shard import parse_shard, select_shard, shard_manifest_path, shard_journal_path, write_summary, merge_shards
 
 def setup_logging():
     logging.basicConfig(
@@ -15,65 +32,224 @@ def setup_logging():
         ]
     )
 
-def process_file(file_path: str, output_path: str, crypto: Crypto, mode: str):
+def process_file(file_path: str, output_path: str, crypto: Crypto, mode: str, target_version: str = 'mv') -> bool:
+    """
+    Processes a single file through the Crypto stream APIs,
+    so memory use stays bounded regardless of file size.
+    """
+    root, ext = os.path.splitext(output_path)
+    if mode == 'decrypt':
+        output_path = root + DECRYPT_EXT_MAP.get(ext.lower(), ext)
+    elif mode == 'encrypt':
+        output_path = root + ENCRYPT_EXT_MAP[target_version].get(ext.lower(), ext)
+
     try:
-        with open(file_path, 'rb') as f:
-            data = f.read()
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with open(file_path, 'rb') as f_in, atomic_write(output_path) as f_out:
+            if mode == 'decrypt':
+                crypto.decrypt_stream(f_in, f_out)
+            elif mode == 'encrypt':
+                crypto.encrypt_stream(f_in, f_out)
 
         if mode == 'decrypt':
-            # Check extension to decide behavior or output extension?
-            # For now, just decrypt content.
-            decrypted_data = crypto.decrypt(data)
-            
-            # Simple extension mapping for Phase 1
-            root, ext = os.path.splitext(output_path)
-            if ext.lower() == '.rpgmvp':
-                output_path = root + '.png'
-            elif ext.lower() == '.rpgmvm':
-                output_path = root + '.m4a'
-            elif ext.lower() == '.rpgmvo':
-                output_path = root + '.ogg'
-            elif ext.lower() == '.png_':
-                 output_path = root + '.png'
-            elif ext.lower() == '.m4a_':
-                 output_path = root + '.m4a'
-            elif ext.lower() == '.ogg_':
-                 output_path = root + '.ogg'
-
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'wb') as f:
-                f.write(decrypted_data)
             logging.info(f"Decrypted: {file_path} -> {output_path}")
+        else:
+            logging.info(f"Encrypted: {file_path} -> {output_path}")
+        return True
+
+    except Exception as e:
+        logging.error(f"Failed to process {file_path}: {e}")
+        return False
+
+def rekey_file(file_path: str, output_path: str, crypto: Crypto, new_key: str) -> bool:
+    """
+    Re-keys a single encrypted file. Only the encrypted prefix is rewritten,
+    in place if output_path is None, otherwise on a copy that is renamed into place once complete.
+    """
+    try:
+        if output_path:
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            with atomic_path(output_path) as tmp_path:
+                clone_file(file_path, tmp_path)
+                with open(tmp_path, 'r+b') as f:
+                    crypto.rekey_stream(f, new_key)
+        else:
+            with open(file_path, 'r+b') as f:
+                crypto.rekey_stream(f, new_key)
+
+        logging.info(f"Rekeyed: {file_path} -> {output_path or file_path}")
+        return True
 
-        elif mode == 'encrypt':
-             encrypted_data = crypto.encrypt(data)
-             # Basic mapping, defaulting to MV style for now
-             root, ext = os.path.splitext(output_path)
-             if ext.lower() == '.png':
-                 output_path = root + '.rpgmvp'
-             elif ext.lower() == '.m4a':
-                 output_path = root + '.rpgmvm'
-             elif ext.lower() == '.ogg':
-                 output_path = root + '.rpgmvo'
-                 
-             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-             with open(output_path, 'wb') as f:
-                f.write(encrypted_data)
-             logging.info(f"Encrypted: {file_path} -> {output_path}")
-             
     except Exception as e:
         logging.error(f"Failed to process {file_path}: {e}")
+        return False
+
+def check_key(crypto: Crypto, paths, samples: int, force: bool, opener=None) -> bool:
+    """
+    Validates the key on a few sampled files before a job starts.
+    Returns False if the job should be aborted.
+    """
+    if samples <= 0:
+        return True
+
+    result = KeyValidator(crypto, samples, opener=opener).validate(paths)
+    if KeyValidator.is_valid(result):
+        if result["checked"]:
+            logging.info(f"Key check passed on {result['passed']} sampled file(s).")
+        return True
+
+    logging.error(f"Key check failed on {len(result['failed'])} of {result['checked']} sampled file(s), e.g. {result['failed'][0]}")
+    if force:
+        logging.warning("Continuing anyway (--force).")
+        return True
+    logging.error("Aborting. Check the key, or pass --force to process anyway.")
+    return False
+
+def log_summary(processed: int, success: int, total_bytes: int, elapsed: float, skipped: int = 0):
+    """Logs the run summary, including peak memory use of the process."""
+    peak = peak_memory_mb()
+    peak_str = f"{peak:.1f} MB" if peak is not None else "n/a"
+    logging.info(
+        f"Summary: {processed} file(s), {success} succeeded, {skipped} up to date, "
+        f"{total_bytes / (1024 * 1024):.2f} MB in {elapsed:.2f}s, peak memory {peak_str}"
+    )
+
+def log_progress(cur, total, pct, speed, elapsed, eta, done_bytes, total_bytes):
+    logging.info(
+        f"Progress: {cur}/{total} files, {done_bytes / (1024 * 1024):.1f}/{total_bytes / (1024 * 1024):.1f} MB ({pct}), "
+        f"{speed:.1f} MB/s, ETA {format_eta(eta)}"
+    )
+
+def run_worker(files, input_dir: str, output_dir: str, crypto: Crypto, mode: str, jobs: int,
+               new_key: str = None, manifest: Manifest = None, progress_rate: float = 1.0,
+               sink: OutputSink = None, status_callback=None, journal: Journal = None, link_mode: str = 'auto',
+               target_version: str = 'mv'):
+    """Runs a WorkerThread over the given files and blocks until it finishes (Ctrl-C cancels)."""
+    def on_finish(success, msg):
+        if success:
+            logging.info(msg)
+        else:
+            logging.error(msg)
+
+    worker = WorkerThread(
+        files=files, mode=mode, crypto=crypto, output_dir=output_dir,
+        progress_callback=log_progress, log_callback=logging.info,
+        finished_callback=on_finish, jobs=jobs, input_root=input_dir, new_key=new_key,
+        manifest=manifest, progress_rate=progress_rate, sink=sink, status_callback=status_callback,
+        journal=journal, link_mode=link_mode, target_version=target_version
+    )
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.5)
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
+    return worker
+
+def run_batch(source: str, output_root: str, jobs: int, use_key_cache: bool = True):
+    """Detects the key of every game under source (a folder or a list file) and decrypts them in parallel."""
+    games = read_game_list(source) if os.path.isfile(source) else find_games(source)
+    if not games:
+        logging.error(f"No games found in {source}")
+        return
+
+    logging.info(f"Batch: {len(games)} game(s), {jobs} parallel jobs")
+    runner = BatchRunner(games, output_root, jobs, use_key_cache=use_key_cache)
+    thread = threading.Thread(target=runner.run)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        runner.stop()
+        thread.join()
+
+    print(f"{'Game':<40} {'Key source':<12} {'Files':>8} {'MB':>10} {'Time':>9}  Status")
+    for r in runner.results:
+        name = os.path.basename(os.path.normpath(r["game"]))
+        status = r["error"] or ("ok" if r["success"] == r["files"] else f"{r['files'] - r['success']} failed")
+        print(f"{name:<40} {r['key_source'] or '-':<12} {r['files']:>8} "
+              f"{r['bytes'] / (1024 * 1024):>10.2f} {r['seconds']:>8.2f}s  {status}")
+
+def run_watch(input_dir: str, output_dir: str, crypto: Crypto, mode: str, jobs: int, use_polling: bool = False,
+              target_version: str = 'mv'):
+    """Processes input_dir once, then keeps output_dir in sync with every change until Ctrl-C."""
+    runner = WatchRunner(input_dir, output_dir, crypto, mode=mode, jobs=jobs, use_polling=use_polling,
+                         target_version=target_version)
+    thread = threading.Thread(target=runner.run)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        runner.stop()
+        thread.join()
+
+def serve(game_dir: str, key: str, host: str, port: int, cache_mb: int, use_key_cache: bool = True):
+    """Serves game_dir over HTTP until Ctrl-C. Detects the key if none is given."""
+    if not os.path.isdir(game_dir):
+        logging.error("--serve needs a game directory.")
+        return
+    if not key:
+        with KeyFinder(game_dir, use_cache=use_key_cache) as finder:
+            key = finder.find_key()
+        if not key:
+            logging.error("Key not found. Pass it with -k.")
+            return
+        logging.info(f"Detected Key: {key}")
+
+    server = AssetServer((host, port), game_dir, Crypto(key), cache_mb * 1024 * 1024)
+    logging.info(f"Serving {game_dir} on http://{host}:{server.server_port}/ (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 def main():
     setup_logging()
     parser = argparse.ArgumentParser(description="RPG Maker MV/MZ Decrypter CLI")
     
     parser.add_argument('--detect-key', metavar='DIR', help='Detect key from game directory')
-    parser.add_argument('-i', '--input', help='Input file or directory')
-    parser.add_argument('-o', '--output', help='Output file or directory')
+    parser.add_argument('--batch', metavar='ROOT_OR_LIST', help='Detect keys and decrypt every game under a folder (or listed in a file) into -o/<game>')
+    parser.add_argument('--no-key-cache', action='store_true', help='Bypass the key cache for key detection')
+    parser.add_argument('--clear-key-cache', action='store_true', help='Clear the key cache')
+    parser.add_argument('--serve', metavar='DIR', help='Serve a game directory over local HTTP, decrypting assets on the fly')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address for --serve (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port for --serve (default: {DEFAULT_PORT})')
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB, help=f'Memory for decrypted data cached by --serve (default: {DEFAULT_CACHE_MB})')
+    parser.add_argument('-i', '--input', help='Input file, directory or packaged game (package.nw / zip / exe with appended zip)')
+    parser.add_argument('-o', '--output', help='Output file or directory; for directory input also a .zip / .tar[.gz|.zst] archive')
     parser.add_argument('-k', '--key', help='Encryption Key (Hex)')
-    parser.add_argument('--mode', choices=['decrypt', 'encrypt'], default='decrypt', help='Operation mode')
+    parser.add_argument('--mode', choices=['decrypt', 'encrypt', 'rekey', 'export', 'convert'], default='decrypt',
+                        help='Operation mode; export mirrors the whole game into -o with assets decrypted, '
+                             'convert renames encrypted files to --target naming without re-encrypting (directory mode)')
+    parser.add_argument('--target', choices=['mv', 'mz'], help='Encrypted file naming for encrypt (default: mv) and convert mode')
+    parser.add_argument('--link-mode', choices=LINK_MODES, default='auto',
+                        help='How export and convert modes place files: reflink, hardlink or copy (default: auto, the first that works)')
+    parser.add_argument('--new-key', help='New Encryption Key (Hex) for rekey mode')
     parser.add_argument('--recursive', action='store_true', help='Recursive processing')
+    parser.add_argument('--incremental', action='store_true', help='Skip files whose outputs are up to date (directory mode)')
+    parser.add_argument('--manifest', metavar='FILE', help=f'Manifest file for incremental mode (default: <output>/{Manifest.DEFAULT_NAME})')
+    parser.add_argument('--shard', metavar='I/N', help='Only process shard I (0 to N-1) of N, for splitting a job across machines (directory mode)')
+    parser.add_argument('--merge-shards', metavar='DIR', help='Combine the per-shard summaries and manifests in an output directory')
+    parser.add_argument('--resume', action='store_true',
+                        help=f'Journal completed files in <output>/{Journal.DEFAULT_NAME} and skip those an interrupted --resume run already did (directory mode)')
+    parser.add_argument('--watch', action='store_true', help='Keep running and re-process changed files, removing outputs of deleted ones (directory mode)')
+    parser.add_argument('--poll', action='store_true', help='Use polling instead of inotify for --watch')
+    parser.add_argument('--hash', action='store_true', help='Also compare content hashes in incremental mode')
+    parser.add_argument('--validate', type=int, default=DEFAULT_SAMPLES, metavar='N',
+                        help=f'Check the key on N sampled files per type before starting, 0 to disable (default: {DEFAULT_SAMPLES})')
+    parser.add_argument('--force', action='store_true', help='Process even if the key check fails')
+    parser.add_argument('--progress-rate', type=float, default=1.0, metavar='HZ', help='Maximum progress updates per second (default: 1)')
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS, help=f'Number of parallel I/O workers (default: {DEFAULT_JOBS})')
 
     args = parser.parse_args()
 
@@ -92,40 +268,214 @@ def main():
             parser.print_help()
         return
 
+    if args.clear_key_cache:
+        get_key_cache().clear()
+        print("Key cache cleared.")
+        if not (args.detect_key or args.batch or args.serve or args.input):
+            return
+
     if args.detect_key:
-        finder = KeyFinder(args.detect_key)
-        key = finder.find_key()
+        with KeyFinder(args.detect_key, use_cache=not args.no_key_cache) as finder:
+            key = finder.find_key()
         if key:
-            print(f"Detected Key: {key}")
+            cached = " (cached)" if finder.from_cache else ""
+            confidence = f", {finder.key_confidence:.0%} confidence" if finder.key_confidence is not None else ""
+            print(f"Detected Key: {key} [{finder.key_source}{confidence}{cached}]")
         else:
             print("Key not found.")
         return
 
-    if args.input and args.output and args.key:
+    if args.batch:
+        if not args.output:
+            parser.error("--batch requires -o/--output")
+        init_language(get_config().language)
+        run_batch(args.batch, args.output, args.jobs, use_key_cache=not args.no_key_cache)
+        return
+
+    if args.serve:
+        serve(args.serve, args.key, args.host, args.port, args.cache_mb, use_key_cache=not args.no_key_cache)
+        return
+
+    if args.merge_shards:
+        try:
+            merged = merge_shards(args.merge_shards)
+        except ValueError as e:
+            logging.error(str(e))
+            return
+        logging.info(
+            f"Merged {merged['shards'] - len(merged['missing'])}/{merged['shards']} shard(s): "
+            f"{merged['files']} file(s), {merged['success']} succeeded, {merged['skipped']} up to date, "
+            f"{len(merged['failed'])} failed, {merged['bytes'] / (1024 * 1024):.2f} MB"
+        )
+        if merged['missing']:
+            logging.warning(f"Missing shard(s): {', '.join(map(str, merged['missing']))}")
+        return
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.mode == 'rekey' and args.input and args.key and not args.new_key:
+        parser.error("--new-key is required for rekey mode")
+    if args.target and args.mode not in ('encrypt', 'convert'):
+        parser.error("--target only applies to encrypt and convert mode")
+    if args.mode == 'convert' and args.input:
+        if not args.target:
+            parser.error("--target is required for convert mode")
+        if args.new_key and not args.key:
+            parser.error("-k (the current key) is required to convert with --new-key")
+        if args.new_key and args.link_mode == 'hardlink':
+            parser.error("--new-key rewrites file contents, which a hardlink would share with the source; use --link-mode reflink or copy")
+
+    # Rekey and convert modes work in place when no output is given; convert needs no key unless it rekeys
+    if args.input and (args.key or args.mode == 'convert') and (args.output or args.mode in ('rekey', 'convert')):
+        init_language(get_config().language)
         crypto = Crypto(args.key)
         
-        if os.path.isfile(args.input):
-            process_file(args.input, args.output, crypto, args.mode)
-        elif os.path.isdir(args.input):
-            input_dir = args.input
-            output_dir = args.output
-            
-            for root, dirs, files in os.walk(input_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    # Filter for relevant files
-                    ext = os.path.splitext(file)[1].lower()
-                    relevant_exts = {'.rpgmvp', '.rpgmvm', '.rpgmvo', '.png_', '.m4a_', '.ogg_'}
-                    if args.mode == 'encrypt':
-                        relevant_exts = {'.png', '.m4a', '.ogg'}
-
-                    if ext in relevant_exts:
-                         rel_path = os.path.relpath(file_path, input_dir)
-                         out_path = os.path.join(output_dir, rel_path)
-                         process_file(file_path, out_path, crypto, args.mode)
-        else:
-            logging.error("Invalid input path.")
+        start_time = time.time()
+        archive = GameArchive(args.input) if is_archive(args.input) else None
+        # Closes the packaged game on every way out, including early returns and parser errors
+        with archive or nullcontext():
+            if archive:
+                if args.mode == 'rekey' or (args.mode == 'convert' and not args.output):
+                    parser.error(f"{args.mode} mode cannot write into an archive; extract it first")
+                if args.incremental:
+                    parser.error("--incremental is not supported for archive input")
+            archive_output = bool(args.output) and is_archive_output(args.output) and not os.path.isfile(args.input)
+            if archive_output:
+                if args.mode == 'rekey':
+                    parser.error("rekey mode needs a directory output")
+                if args.incremental:
+                    parser.error("--incremental is not supported for archive output")
+                if shard:
+                    parser.error("--shard needs a directory output shared by (or merged from) all shards")
+                if args.resume:
+                    parser.error("--resume needs a directory output")
+
+            if args.watch:
+                if shard:
+                    parser.error("--shard cannot be combined with --watch")
+                if archive or archive_output or not os.path.isdir(args.input) or args.mode not in ('encrypt', 'decrypt'):
+                    parser.error("--watch needs a source directory, a directory output and --mode encrypt or decrypt")
+                run_watch(args.input, args.output, crypto, args.mode, args.jobs, use_polling=args.poll,
+                          target_version=args.target or 'mv')
+                return
+
+            if os.path.isfile(args.input) and not archive:
+                if args.mode in ('export', 'convert'):
+                    parser.error(f"{args.mode} mode needs a game directory or packaged game")
+                if args.mode != 'encrypt' and not check_key(crypto, [args.input], args.validate, args.force):
+                    return
+                if args.mode == 'rekey':
+                    success = rekey_file(args.input, args.output, crypto, args.new_key)
+                else:
+                    success = process_file(args.input, args.output, crypto, args.mode, args.target or 'mv')
+                log_summary(1, int(success), os.path.getsize(args.input), time.time() - start_time)
+            elif os.path.isdir(args.input) or archive:
+                # A packaged game is walked like a directory; its files are streamed out of the archive
+                input_dir = archive.path if archive else args.input
+                output_dir = args.output
+                walk = archive.walk if archive else os.walk
+
+                # Filter for relevant files
+                relevant_exts = set(DECRYPT_EXT_MAP)
+                if args.mode == 'encrypt':
+                    relevant_exts = set(ENCRYPT_EXT_MAP['mv'])
+
+                files = []
+                for root, dirs, filenames in walk(input_dir):
+                    for file in filenames:
+                        ext = os.path.splitext(file)[1].lower()
+                        # Export mode mirrors every file
+                        if ext in relevant_exts or args.mode == 'export':
+                            file_info = {'path': os.path.join(root, file)}
+                            if archive:
+                                file_info['archive'] = archive
+                            files.append(file_info)
+
+                # Every process of a sharded job sees the same file list and keeps its own slice of it
+                if shard:
+                    total_files = len(files)
+                    files = select_shard(files, input_dir, *shard)
+                    logging.info(f"Shard {shard[0]}/{shard[1]}: {len(files)} of {total_files} file(s)")
+
+                # With --resume, completed files are journaled (in place rekeying/converting: next to the inputs),
+                # so a crashed run can pick up where it stopped; the journal is deleted once a run completes cleanly
+                journal = None
+                if args.resume and not archive_output:
+                    journal_dir = output_dir or input_dir
+                    journal_path = shard_journal_path(journal_dir, *shard) if shard else os.path.join(journal_dir, Journal.DEFAULT_NAME)
+                    # The new key is part of a rekey or convert job's settings (hashed, like the key)
+                    journal_mode = f"{args.mode}:{args.new_key.lower()}" if args.new_key else args.mode
+                    journal = Journal(journal_path, Manifest.settings_fingerprint(crypto, journal_mode, args.target or 'mv'),
+                                      resume=True)
+                    if journal.entries:
+                        logging.info(f"Resuming: {len(journal.entries)} file(s) completed by the previous run")
+
+                # Files a resumed in-place job already rekeyed no longer match the current key, so they are not sampled
+                opener = archive.open if archive else None
+                encrypted_paths = [f['path'] for f in files
+                                   if os.path.splitext(f['path'])[1].lower() in DECRYPT_EXT_MAP
+                                   and not (journal and os.path.relpath(f['path'], input_dir) in journal)]
+                if args.mode != 'encrypt' and args.key and not check_key(crypto, encrypted_paths, args.validate, args.force, opener):
+                    if journal:
+                        # Keep what an earlier run completed, but don't leave an empty journal behind
+                        if journal.entries:
+                            journal.close()
+                        else:
+                            journal.discard()
+                    return
+
+                manifest = None
+                if args.incremental and args.mode not in ('rekey', 'convert'):
+                    manifest_path = args.manifest or os.path.join(output_dir, Manifest.DEFAULT_NAME)
+                    if shard and not args.manifest:
+                        manifest_path = shard_manifest_path(output_dir, *shard)
+                    fingerprint = Manifest.settings_fingerprint(crypto, args.mode, args.target or 'mv')
+                    manifest = Manifest(manifest_path, fingerprint, use_hash=args.hash, root=input_dir)
+
+                # Results stream into a zip/tar when -o names an archive, otherwise into the directory
+                sink = None
+                if archive_output:
+                    try:
+                        sink = open_sink(output_dir)
+                    except ValueError as e:
+                        parser.error(str(e))
+                    output_dir = None
+
+                failed = []
+                def on_status(index, status):
+                    if status == "Error":
+                        failed.append(os.path.relpath(files[index]['path'], input_dir).replace(os.sep, '/'))
+
+                worker = run_worker(files, input_dir, output_dir, crypto, args.mode, args.jobs, args.new_key, manifest,
+                                    args.progress_rate, sink, on_status, journal, args.link_mode, args.target or 'mv')
+                if sink:
+                    sink.close()
+                if journal:
+                    if worker.processed_count == len(files) and not failed:
+                        journal.discard()
+                    else:
+                        journal.close()
+                elapsed = time.time() - start_time
+                log_summary(worker.processed_count, worker.success_count, worker.processed_bytes,
+                            elapsed, worker.skipped_count)
+                if worker.link_counts:
+                    logging.info("Placed without re-encoding: " + ", ".join(f"{count} {method}" for method, count in sorted(worker.link_counts.items())))
+                if shard:
+                    write_summary(output_dir or input_dir, *shard, {
+                        "files": len(files),
+                        "success": worker.success_count,
+                        "skipped": worker.skipped_count,
+                        "bytes": worker.processed_bytes,
+                        "seconds": round(elapsed, 3),
+                        "failed": sorted(failed),
+                    })
+            else:
+                logging.error("Invalid input path.")
     else:
         parser.print_help()
 